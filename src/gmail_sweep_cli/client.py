@@ -0,0 +1,119 @@
+"""Client for a running gmail_sweep_cli daemon (see --daemon)."""
+
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any, Dict, Optional
+
+import click
+
+from gmail_sweep_cli.modules.daemon import DaemonError, call, get_socket_path
+from gmail_sweep_cli.modules.models import SORT_MODES
+
+
+def _request(ctx: click.Context, op: str, args: Optional[Dict[str, Any]] = None) -> None:
+    """Send a request to the daemon and print the JSON result."""
+    try:
+        result = call(ctx.obj["socket"], op, args)
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if result is not None:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+@click.group()
+@click.argument("email")
+@click.option("--cache-dir", default="./cache/", help="Cache directory the daemon was started with.")
+@click.option("--socket", "socket_path", default=None, help="Daemon socket path (default: <cache-dir>/<email>.sock).")
+@click.pass_context
+def main(ctx, email, cache_dir, socket_path):
+    """Send commands to a gmail_sweep_cli daemon.
+
+    EMAIL is the Gmail address the daemon serves (required).
+    """
+    ctx.obj = {"socket": get_socket_path(cache_dir, email, socket_path)}
+
+
+@main.command()
+@click.pass_context
+def ping(ctx):
+    """Check the daemon and show the loaded period."""
+    _request(ctx, "ping")
+
+
+@main.command()
+@click.option("--days", "-d", default=None, type=int, help="Collection period in days.")
+@click.option("--start", "-s", default=None, help="Collection start date (YYYY-MM-DD).")
+@click.option("--end", "-e", default=None, help="Collection end date (YYYY-MM-DD).")
+@click.option("--refresh", "-r", is_flag=True, default=False, help="Re-collect even if the period is cached.")
+@click.pass_context
+def collect(ctx, days, start, end, refresh):
+    """Load a period from the cache, or collect it."""
+    _request(ctx, "collect", {"days": days, "start": start, "end": end, "refresh": refresh})
+
+
+@main.command()
+@click.option("--limit", "-n", default=20, type=int, help="Number of addresses (default: 20).")
+@click.option("--offset", default=0, type=int, help="Number of addresses to skip.")
+@click.option("--sort", "sort_mode", default=None, type=click.Choice(SORT_MODES), help="Sort order (default: count).")
+@click.pass_context
+def report(ctx, limit, offset, sort_mode):
+    """Show addresses of the loaded period, sorted by count, size or frequency."""
+    _request(ctx, "report", {"limit": limit, "offset": offset, "sort": sort_mode})
+
+
+@main.command()
+@click.argument("addresses", nargs=-1, required=True)
+@click.pass_context
+def mark(ctx, addresses):
+    """Mark addresses for deletion."""
+    _request(ctx, "mark", {"addresses": list(addresses)})
+
+
+@main.command()
+@click.argument("addresses", nargs=-1)
+@click.pass_context
+def unmark(ctx, addresses):
+    """Unmark addresses (all of them if none are given)."""
+    _request(ctx, "unmark", {"addresses": list(addresses) if addresses else None})
+
+
+@main.command()
+@click.pass_context
+def marked(ctx):
+    """List marked addresses."""
+    _request(ctx, "marked")
+
+
+@main.command()
+@click.option("--exact", is_flag=True, default=False, help="Count exactly instead of estimating.")
+@click.pass_context
+def estimate(ctx, exact):
+    """Estimate the all-period deletion impact of the marked addresses."""
+    _request(ctx, "estimate", {"exact": exact})
+
+
+@main.command()
+@click.option("--yes", "confirm", is_flag=True, default=False, help="Confirm moving the mail to Trash.")
+@click.option("--period", "current_period", is_flag=True, default=False, help="Only delete mail in the loaded period (from stored ids, no listing).")
+@click.option("--exact", is_flag=True, default=False, help="Count exactly before deleting (all periods only).")
+@click.pass_context
+def delete(ctx, confirm, current_period, exact):
+    """Move mail from the marked addresses to Trash (starred/important skipped).
+
+    Without --period, mail from ALL periods is moved.
+    """
+    _request(ctx, "delete", {"confirm": confirm, "scope": "period" if current_period else "all", "exact": exact})
+
+
+@main.command()
+@click.pass_context
+def shutdown(ctx):
+    """Stop the daemon."""
+    _request(ctx, "shutdown")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
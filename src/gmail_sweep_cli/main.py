@@ -2,21 +2,36 @@
 
 from __future__ import annotations
 
+import sys
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
 import click
 
-from gmail_sweep_cli.modules.auth import load_credentials, run_auth_flow
+from gmail_sweep_cli.modules.auth import get_token_path, load_credentials, run_auth_flow
+from gmail_sweep_cli.modules.cache_store import DEFAULT_CACHE_SIZE_MB, PeriodCacheStore, is_stale
 from gmail_sweep_cli.modules.collector import build_gmail_service, collect_emails
-from gmail_sweep_cli.modules.deleter import delete_emails_for_addresses, print_delete_results
+from gmail_sweep_cli.modules.daemon import get_socket_path, serve
+from gmail_sweep_cli.modules.deleter import (
+    DeleteResult,
+    PeriodDeletePlan,
+    delete_emails_for_addresses,
+    delete_emails_in_period,
+    plan_period_delete,
+    print_delete_results,
+)
 from gmail_sweep_cli.modules.display import (
     display_delete_confirmation,
     display_detail_screen,
     display_main_screen,
     display_marked_list,
+    display_period_delete_confirmation,
 )
-from gmail_sweep_cli.modules.models import AppState, CollectedData
+from gmail_sweep_cli.modules.estimator import ImpactEstimate, estimate_impact
+from gmail_sweep_cli.modules.models import SORT_MODES, AppState, CollectedData
+from gmail_sweep_cli.modules.prefetch import Period, PeriodCache, Prefetcher
 
 
 def _compute_period(days: int, start: str | None, end: str | None, shift: int = 0):
@@ -53,17 +68,79 @@ def _compute_period(days: int, start: str | None, end: str | None, shift: int =
     return s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d"), days
 
 
-def _get_data_path(cache_dir: str, email: str) -> Path:
-    """Return the JSON data file path for the given email."""
-    return Path(cache_dir) / f"{email}_data.json"
+def _import_legacy_cache(cache_dir: str, email: str, store: PeriodCacheStore) -> None:
+    """Move data from the old single-file cache (<email>_data.json) into the store."""
+    legacy_path = Path(cache_dir) / f"{email}_data.json"
+    legacy = CollectedData.load(legacy_path)
+    if legacy:
+        store.put(legacy)
+        legacy_path.unlink()
+
 
+def _rewindow_cached(store: PeriodCacheStore, cache: PeriodCache, period_start: str, period_end: str) -> Optional[CollectedData]:
+    """Derive a period locally from a cached period that contains it (memory first, then disk).
 
-def _collect_and_save(service, state: AppState, cache_dir: str) -> None:
-    """Collect emails from Gmail API and save to JSON."""
-    data = collect_emails(service, state.period_start, state.period_end)
-    data_path = _get_data_path(cache_dir, state.email)
-    data.save(data_path)
+    Returns None if no cached period with per-day histograms covers it.
+    """
+    source = cache.find_covering(period_start, period_end)
+    if source is None:
+        entry = store.covering(period_start, period_end)
+        source = store.get(entry.period_start, entry.period_end) if entry else None
+        if source is None or not source.covers(period_start, period_end):
+            return None
+        cache.put(source)
+    return source.rewindow(period_start, period_end)
+
+
+def _collect_and_save(service, state: AppState, store: PeriodCacheStore, prefetcher: Prefetcher) -> None:
+    """Collect emails from Gmail API and save to the cache."""
+    with prefetcher.foreground():
+        data = collect_emails(service, state.period_start, state.period_end, store.directory, state.memory_limit_mb)
+    store.put(data)
     state.data = data
+    prefetcher.cache.put(data)
+
+
+def _create_prefetcher(service, state: AppState, store: PeriodCacheStore) -> Prefetcher:
+    """Create the background prefetcher for adjacent periods."""
+    cache = PeriodCache()
+
+    def collect(period_start: str, period_end: str, checkpoint) -> CollectedData:
+        cached = store.get(period_start, period_end) or _rewindow_cached(store, cache, period_start, period_end)
+        if cached:
+            return cached
+        data = collect_emails(service, period_start, period_end, store.directory, state.memory_limit_mb, checkpoint=checkpoint, verbose=False)
+        store.put(data)
+        return data
+
+    return Prefetcher(collect, cache)
+
+
+def _adjacent_periods(state: AppState) -> List[Period]:
+    """Return the previous and next periods of the current one."""
+    periods: List[Period] = []
+    for shift in (state.shift_count - 1, state.shift_count + 1):
+        period_start, period_end, _ = _compute_period(state.days, None, None, shift)
+        period = (period_start, period_end)
+        if period != (state.period_start, state.period_end) and period not in periods:
+            periods.append(period)
+    return periods
+
+
+def _show_period(service, state: AppState, store: PeriodCacheStore, prefetcher: Prefetcher) -> None:
+    """Load the current period from memory, then the disk cache, then the API.
+
+    A period inside a longer cached period is derived from it locally.
+    """
+    period = (state.period_start, state.period_end)
+    data = prefetcher.take(period) or store.get(*period) or _rewindow_cached(store, prefetcher.cache, *period)
+    if data:
+        state.data = data
+        prefetcher.cache.put(data)
+    else:
+        _collect_and_save(service, state, store, prefetcher)
+    state.current_page = 1
+    prefetcher.schedule(_adjacent_periods(state))
 
 
 def _handle_detail(state: AppState, number: int) -> None:
@@ -71,7 +148,7 @@ def _handle_detail(state: AppState, number: int) -> None:
     if not state.data:
         return
 
-    sorted_items = state.data.sorted_addresses()
+    sorted_items = state.data.sorted_addresses(state.sort_mode)
     idx = number - 1
     if idx < 0 or idx >= len(sorted_items):
         print("Invalid number.")
@@ -91,14 +168,100 @@ def _handle_detail(state: AppState, number: int) -> None:
         print("Invalid input. Press Enter to go back or type 'mark' to mark for deletion.")
 
 
-def _delete_cache(cache_dir: str, email: str) -> None:
-    """Delete the cache JSON file for the given email."""
-    data_path = _get_data_path(cache_dir, email)
-    if data_path.exists():
-        data_path.unlink()
+def _confirm_delete(service, state: AppState) -> Optional[Dict[str, ImpactEstimate]]:
+    """Show the delete confirmation with all-period impact estimates.
+
+    Returns the estimates if the user confirmed, otherwise None.
+    """
+    if not state.marked_addresses:
+        print("No addresses marked for deletion.")
+        return None
+
+    print("Estimating impact across all periods...")
+    estimates = estimate_impact(service, state.marked_addresses)
+    while True:
+        answer = display_delete_confirmation(state, estimates)
+        if answer == "e" and not all(e.exact for e in estimates.values()):
+            print("Counting emails exactly...")
+            estimates = estimate_impact(service, state.marked_addresses, exact=True)
+            continue
+        if answer == "Y":
+            return estimates
+        print("Cancelled.")
+        return None
+
+
+def _period_delete_problem(state: AppState) -> Optional[str]:
+    """Return why the current period's stored ids cannot be used for deletion, or None."""
+    if not state.marked_addresses:
+        return "No addresses marked for deletion."
+    if not state.data:
+        return "No data loaded."
+    if is_stale(state.data.collected_at):
+        return "Collected data is stale. Re-collect before deleting within the period."
+    if state.data.id_store:
+        missing = not Path(state.data.id_store).exists()
+        return "Message ids of this period are no longer cached. Re-collect first." if missing else None
+    for addr in state.marked_addresses:
+        info = state.data.addresses.get(addr)
+        if info is not None and info.count and not info.message_ids:
+            return "Collected data has no message ids (older cache). Re-collect first."
+    return None
+
+
+def _delete_in_period(service, state: AppState, store: PeriodCacheStore, prefetcher: Prefetcher, plan: PeriodDeletePlan) -> List[DeleteResult]:
+    """Trash the marked addresses' emails in the current period as planned from stored ids."""
+    data = state.data
+    # A background collection finishing after the delete would cache stale data
+    prefetcher.cancel_all(wait=True)
+    with prefetcher.foreground():
+        results = delete_emails_in_period(service, plan)
+
+    # The period changed on the server: drop it (and any cached period
+    # sharing its days) from the caches, and the addresses from the view
+    for addr in state.marked_addresses:
+        data.addresses.pop(addr, None)
+    data.invalidate_orderings()
+    store.discard_overlapping(data.period_start, data.period_end)
+    prefetcher.cache.discard_overlapping(data.period_start, data.period_end)
+    state.marked_addresses.clear()
+    state.current_page = 1
+    return results
+
+
+def _handle_period_delete(service, state: AppState, store: PeriodCacheStore, prefetcher: Prefetcher) -> None:
+    """Handle the period-delete command."""
+    problem = _period_delete_problem(state)
+    if problem:
+        print(problem)
+    else:
+        plan = plan_period_delete(state.data, state.marked_addresses)
+        if display_period_delete_confirmation(state, plan):
+            print_delete_results(_delete_in_period(service, state, store, prefetcher, plan))
+        else:
+            print("Cancelled.")
+
+
+def _handle_days(service, state: AppState, store: PeriodCacheStore, prefetcher: Prefetcher, arg: str) -> None:
+    """Handle the days command: show the last N days (derived locally when cached)."""
+    if not arg.isdigit() or int(arg) < 1:
+        print("Usage: days N")
+        return
+    state.shift_count = 0
+    state.period_start, state.period_end, state.days = _compute_period(int(arg), None, None)
+    _show_period(service, state, store, prefetcher)
+
 
+def _handle_sort(state: AppState, mode: str) -> None:
+    """Handle the sort command."""
+    if mode in SORT_MODES:
+        state.sort_mode = mode
+        state.current_page = 1
+    else:
+        print(f"Usage: sort {'|'.join(SORT_MODES)}")
 
-def _run_interactive(state: AppState, service, cache_dir: str) -> None:
+
+def _run_interactive(state: AppState, service, store: PeriodCacheStore, prefetcher: Prefetcher) -> None:
     """Run the interactive main loop."""
     while True:
         display_main_screen(state)
@@ -109,33 +272,31 @@ def _run_interactive(state: AppState, service, cache_dir: str) -> None:
             print("Bye!")
             break
 
-        should_exit = _dispatch_command(cmd, state, service, cache_dir)
+        should_exit = _dispatch_command(cmd, state, service, store, prefetcher)
         if should_exit:
             break
 
 
-def _dispatch_command(cmd: str, state: AppState, service, cache_dir: str) -> bool:
+def _dispatch_command(cmd: str, state: AppState, service, store: PeriodCacheStore, prefetcher: Prefetcher) -> bool:
     """Dispatch a single command from the interactive loop.
 
     Returns True if the program should exit after this command.
     """
     if cmd == "r":
-        _collect_and_save(service, state, cache_dir)
+        _collect_and_save(service, state, store, prefetcher)
         state.current_page = 1
     elif cmd == "prev":
         state.shift_count -= 1
         period_start, period_end, _ = _compute_period(state.days, None, None, state.shift_count)
         state.period_start = period_start
         state.period_end = period_end
-        _collect_and_save(service, state, cache_dir)
-        state.current_page = 1
+        _show_period(service, state, store, prefetcher)
     elif cmd == "next":
         state.shift_count += 1
         period_start, period_end, _ = _compute_period(state.days, None, None, state.shift_count)
         state.period_start = period_start
         state.period_end = period_end
-        _collect_and_save(service, state, cache_dir)
-        state.current_page = 1
+        _show_period(service, state, store, prefetcher)
     elif cmd == "<":
         if state.current_page > 1:
             state.current_page -= 1
@@ -146,22 +307,28 @@ def _dispatch_command(cmd: str, state: AppState, service, cache_dir: str) -> boo
             state.current_page += 1
         else:
             print("Already on the last page.")
+    elif cmd.startswith("days"):
+        _handle_days(service, state, store, prefetcher, cmd[len("days") :].strip())
+    elif cmd.startswith("sort"):
+        _handle_sort(state, cmd[len("sort") :].strip())
     elif cmd == "l":
         display_marked_list(state)
         input("Press Enter to continue...")
     elif cmd == "c":
         state.marked_addresses.clear()
         print("All marks cleared.")
+    elif cmd == "period-delete":
+        _handle_period_delete(service, state, store, prefetcher)
     elif cmd == "all-delete":
-        confirmed = display_delete_confirmation(state)
-        if confirmed:
-            results = delete_emails_for_addresses(service, state.marked_addresses)
+        with prefetcher.foreground():
+            estimates = _confirm_delete(service, state)
+        if estimates is not None:
+            prefetcher.shutdown()
+            results = delete_emails_for_addresses(service, state.marked_addresses, estimates)
             print_delete_results(results)
-            _delete_cache(cache_dir, state.email)
+            store.clear()
             print("Cache cleared. Exiting.")
             return True
-        if state.marked_addresses:
-            print("Cancelled.")
     else:
         try:
             number = int(cmd)
@@ -171,6 +338,114 @@ def _dispatch_command(cmd: str, state: AppState, service, cache_dir: str) -> boo
     return False
 
 
+def _data_summary(state: AppState) -> Dict[str, Any]:
+    """Summary of the loaded data for daemon responses."""
+    if not state.data:
+        return {"loaded": False}
+    return {
+        "loaded": True,
+        "period_start": state.data.period_start,
+        "period_end": state.data.period_end,
+        "collected_at": state.data.collected_at,
+        "addresses": len(state.data.addresses),
+        "emails": state.data.total_emails,
+    }
+
+
+def _daemon_handlers(service, state: AppState, store: PeriodCacheStore, prefetcher: Prefetcher) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """Build the daemon operations, all sharing the warm service, cache and state."""
+
+    def collect(args: Dict[str, Any]) -> Dict[str, Any]:
+        period_start, period_end, days = _compute_period(int(args.get("days") or state.days), args.get("start"), args.get("end"))
+        state.period_start, state.period_end, state.days = period_start, period_end, days
+        state.shift_count = 0
+        if args.get("refresh"):
+            _collect_and_save(service, state, store, prefetcher)
+        else:
+            _show_period(service, state, store, prefetcher)
+        return _data_summary(state)
+
+    def report(args: Dict[str, Any]) -> Dict[str, Any]:
+        if not state.data:
+            raise ValueError("No data loaded. Run 'collect' first.")
+        offset = int(args.get("offset", 0))
+        limit = int(args.get("limit", 20))
+        items = state.data.sorted_addresses(args.get("sort") or state.sort_mode)[offset : offset + limit]
+        rows = [
+            {
+                "no": offset + i + 1,
+                "address": addr,
+                "count": info.count,
+                "frequency_days": info.frequency_days,
+                "total_bytes": info.total_bytes,
+                "average_bytes": info.average_bytes,
+                "subjects": info.subjects,
+            }
+            for i, (addr, info) in enumerate(items)
+        ]
+        return {**_data_summary(state), "items": rows}
+
+    def mark(args: Dict[str, Any]) -> List[str]:
+        state.marked_addresses.update(args.get("addresses", []))
+        return sorted(state.marked_addresses)
+
+    def unmark(args: Dict[str, Any]) -> List[str]:
+        addresses = args.get("addresses")
+        if addresses is None:
+            state.marked_addresses.clear()
+        else:
+            state.marked_addresses.difference_update(addresses)
+        return sorted(state.marked_addresses)
+
+    def estimate(args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        estimates = estimate_impact(service, state.marked_addresses, exact=bool(args.get("exact")))
+        return [{**asdict(e), "message_ids": None, "to_trash": e.to_trash} for e in estimates.values()]
+
+    def delete(args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not state.marked_addresses:
+            raise ValueError("No addresses marked for deletion.")
+        if args.get("scope") == "period":
+            problem = _period_delete_problem(state)
+            if problem:
+                raise ValueError(problem)
+            if not args.get("confirm"):
+                raise ValueError("Deletion moves mail in the current period to Trash; rerun with --yes to proceed.")
+            plan = plan_period_delete(state.data, state.marked_addresses)
+            return [asdict(r) for r in _delete_in_period(service, state, store, prefetcher, plan)]
+        if not args.get("confirm"):
+            raise ValueError("Deletion moves mail from ALL periods to Trash; rerun with --yes to proceed.")
+        # A background collection finishing after the delete would cache stale data
+        prefetcher.cancel_all(wait=True)
+        with prefetcher.foreground():
+            estimates = estimate_impact(service, state.marked_addresses, exact=bool(args.get("exact")))
+            results = delete_emails_for_addresses(service, state.marked_addresses, estimates)
+        store.clear()
+        prefetcher.cache.clear()
+        state.marked_addresses.clear()
+        state.data = None
+        return [asdict(r) for r in results]
+
+    return {
+        "ping": lambda args: _data_summary(state),
+        "collect": collect,
+        "report": report,
+        "mark": mark,
+        "unmark": unmark,
+        "marked": lambda args: sorted(state.marked_addresses),
+        "estimate": estimate,
+        "delete": delete,
+    }
+
+
+def _run_daemon(service, state: AppState, store: PeriodCacheStore, prefetcher: Prefetcher, socket_path: Path) -> None:
+    """Serve collect/report/mark/delete over a Unix domain socket."""
+    try:
+        serve(socket_path, _daemon_handlers(service, state, store, prefetcher))
+    except OSError as e:
+        print(f"Error: Cannot start daemon: {e}")
+        sys.exit(1)
+
+
 @click.command()
 @click.argument("email")
 @click.option("--auth", "-a", "run_auth", is_flag=True, default=False, help="Run authentication flow.")
@@ -180,7 +455,13 @@ def _dispatch_command(cmd: str, state: AppState, service, cache_dir: str) -> boo
 @click.option("--credentials", "-c", default="./credentials/client_secret.json", help="Path to client_secret.json.")
 @click.option("--token-dir", "-t", default="./credentials/", help="Token storage directory.")
 @click.option("--cache-dir", default="./cache/", help="Cache directory for collected data.")
-def main(email, run_auth, days, start, end, credentials, token_dir, cache_dir):  # pylint: disable=too-many-positional-arguments
+@click.option("--cache-size", default=DEFAULT_CACHE_SIZE_MB, type=int, help=f"Disk budget for cached periods in MB (default: {DEFAULT_CACHE_SIZE_MB}).")
+@click.option("--memory-limit", default=None, type=int, help="Collect in spill-to-disk mode with this memory cap in MB.")
+@click.option("--daemon", "run_daemon", is_flag=True, default=False, help="Run as a daemon serving requests on a Unix domain socket.")
+@click.option("--socket", "socket_path", default=None, help="Daemon socket path (default: <cache-dir>/<email>.sock).")
+def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    email, run_auth, days, start, end, credentials, token_dir, cache_dir, cache_size, memory_limit, run_daemon, socket_path
+):
     """Gmail Sweep CLI - Aggregate and clean up Gmail by sender address.
 
     EMAIL is the target Gmail address (required).
@@ -191,7 +472,7 @@ def main(email, run_auth, days, start, end, credentials, token_dir, cache_dir):
 
     # Load credentials
     creds = load_credentials(email, token_dir)
-    service = build_gmail_service(creds)
+    service = build_gmail_service(creds, get_token_path(token_dir, email))
 
     # Compute period
     period_start, period_end, computed_days = _compute_period(days, start, end)
@@ -201,20 +482,25 @@ def main(email, run_auth, days, start, end, credentials, token_dir, cache_dir):
         period_start=period_start,
         period_end=period_end,
         days=computed_days,
+        memory_limit_mb=memory_limit,
     )
 
-    # Try loading existing data
-    data_path = _get_data_path(cache_dir, email)
-    existing = CollectedData.load(data_path)
-    if existing:
-        print(f"Loaded existing data from {data_path}")
-        state.data = existing
-        state.period_start = existing.period_start
-        state.period_end = existing.period_end
-    else:
-        _collect_and_save(service, state, cache_dir)
-
-    _run_interactive(state, service, cache_dir)
+    store = PeriodCacheStore(cache_dir, email, cache_size)
+    _import_legacy_cache(cache_dir, email, store)
+    prefetcher = _create_prefetcher(service, state, store)
+    try:
+        if run_daemon:
+            _run_daemon(service, state, store, prefetcher, get_socket_path(cache_dir, email, socket_path))
+            return
+
+        # Load the requested period from the cache, or collect it
+        _show_period(service, state, store, prefetcher)
+
+        _run_interactive(state, service, store, prefetcher)
+    finally:
+        # Stop background requests before closing the pooled connections
+        prefetcher.shutdown()
+        service.close()
 
 
 if __name__ == "__main__":
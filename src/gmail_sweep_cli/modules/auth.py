@@ -39,6 +39,12 @@ def run_auth_flow(email: str, credentials_path: str, token_dir: str) -> None:
     print(f"Authentication successful. Token saved to {token_path}")
 
 
+def save_credentials(creds: Credentials, token_path: Path) -> None:
+    """Write the (refreshed) credentials back to the token file."""
+    with open(token_path, "w", encoding="utf-8") as f:
+        f.write(creds.to_json())
+
+
 def load_credentials(email: str, token_dir: str) -> Credentials:
     """Load and refresh credentials from the token file."""
     token_path = get_token_path(token_dir, email)
@@ -52,8 +58,7 @@ def load_credentials(email: str, token_dir: str) -> Credentials:
 
     if creds.expired and creds.refresh_token:
         creds.refresh(Request())
-        with open(token_path, "w", encoding="utf-8") as f:
-            f.write(creds.to_json())
+        save_credentials(creds, token_path)
 
     if not creds.valid:
         print("Error: Token is invalid. Please re-authenticate.")
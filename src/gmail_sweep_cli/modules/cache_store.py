@@ -0,0 +1,229 @@
+"""Multi-period on-disk cache of collected data."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from gmail_sweep_cli.modules.models import CollectedData, period_days
+from gmail_sweep_cli.utils.spill import remove_stale_spill_files
+
+DEFAULT_CACHE_SIZE_MB = 200
+STALE_AFTER_HOURS = 24
+INDEX_FILE = "index.json"
+
+
+@dataclass
+class CacheEntry:  # pylint: disable=too-many-instance-attributes
+    """Index entry describing one cached period."""
+
+    period_start: str = ""
+    period_end: str = ""
+    file: str = ""
+    collected_at: str = ""
+    last_accessed: str = ""
+    size_bytes: int = 0
+    daily_histograms: bool = False
+    id_store: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "period_start": self.period_start,
+            "period_end": self.period_end,
+            "file": self.file,
+            "collected_at": self.collected_at,
+            "last_accessed": self.last_accessed,
+            "size_bytes": self.size_bytes,
+            "daily_histograms": self.daily_histograms,
+            "id_store": self.id_store,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> CacheEntry:
+        """Create from dictionary."""
+        return cls(
+            period_start=data.get("period_start", ""),
+            period_end=data.get("period_end", ""),
+            file=data.get("file", ""),
+            collected_at=data.get("collected_at", ""),
+            last_accessed=data.get("last_accessed", ""),
+            size_bytes=data.get("size_bytes", 0),
+            daily_histograms=data.get("daily_histograms", False),
+            id_store=data.get("id_store", ""),
+        )
+
+
+class PeriodCacheStore:
+    """Per-account cache directory holding one JSON file per period.
+
+    Layout: <cache_dir>/<email>/<start>_<end>.json (plus the spill-mode id
+    store of the period, if any) and an index.json with access times, sizes
+    and staleness metadata. When the total size exceeds the budget, the
+    least recently used periods are evicted. Spill-mode collections keep
+    their temporary database here too; ones left behind by a killed process
+    are swept on open. Safe to use from the prefetch thread and the main
+    thread at the same time.
+    """
+
+    def __init__(self, cache_dir: str, email: str, size_limit_mb: int = DEFAULT_CACHE_SIZE_MB):
+        self.directory = Path(cache_dir) / email
+        self.size_limit = size_limit_mb * 1024 * 1024
+        self._lock = threading.RLock()
+        self._entries: Dict[Tuple[str, str], CacheEntry] = {}
+        self._load_index()
+        remove_stale_spill_files(self.directory)
+
+    @property
+    def index_path(self) -> Path:
+        """Path of the index file."""
+        return self.directory / INDEX_FILE
+
+    def _load_index(self) -> None:
+        """Read the index, dropping entries whose file has disappeared."""
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        for item in raw.get("entries", []):
+            entry = CacheEntry.from_dict(item)
+            if (self.directory / entry.file).exists():
+                self._entries[(entry.period_start, entry.period_end)] = entry
+
+    def _save_index(self) -> None:
+        """Write the index file (via a temporary file, like CollectedData.save)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{INDEX_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": [e.to_dict() for e in self._entries.values()]}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def covering(self, period_start: str, period_end: str) -> Optional[CacheEntry]:
+        """Return the shortest cached period containing the given one, or None.
+
+        Only periods with per-day histograms qualify, since the sub-period
+        is derived locally (see CollectedData.rewindow).
+        """
+        with self._lock:
+            candidates = [e for e in self._entries.values() if e.daily_histograms and e.period_start <= period_start and period_end <= e.period_end]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda e: period_days(e.period_start, e.period_end))
+
+    def get(self, period_start: str, period_end: str) -> Optional[CollectedData]:
+        """Load a cached period and mark it as recently used.
+
+        Returns None if the period is absent; an unreadable or corrupt file
+        is dropped from the cache and also yields None.
+        """
+        with self._lock:
+            entry = self._entries.get((period_start, period_end))
+            if entry is None:
+                return None
+            try:
+                data = CollectedData.load(self.directory / entry.file)
+            except (OSError, ValueError):
+                data = None
+            if data is None:
+                self.discard(period_start, period_end)
+                return None
+            entry.last_accessed = _now()
+            self._save_index()
+            return data
+
+    def put(self, data: CollectedData) -> None:
+        """Store collected data for its period and evict down to the size budget."""
+        key = (data.period_start, data.period_end)
+        file_name = f"{data.period_start}_{data.period_end}.json"
+        with self._lock:
+            path = self.directory / file_name
+            data.save(path)
+            previous = self._entries.get(key)
+            if previous is not None and previous.id_store != data.id_store:
+                _unlink(previous.id_store)
+            self._entries[key] = CacheEntry(
+                period_start=data.period_start,
+                period_end=data.period_end,
+                file=file_name,
+                collected_at=data.collected_at,
+                last_accessed=_now(),
+                size_bytes=path.stat().st_size + (Path(data.id_store).stat().st_size if data.id_store else 0),
+                daily_histograms=data.daily_histograms,
+                id_store=data.id_store,
+            )
+            self._evict(keep=key)
+            self._save_index()
+
+    def _remove_files(self, entry: CacheEntry) -> None:
+        """Delete the files of a cached period."""
+        (self.directory / entry.file).unlink(missing_ok=True)
+        _unlink(entry.id_store)
+
+    def _evict(self, keep: Tuple[str, str]) -> None:
+        """Remove least recently used periods until under the size budget."""
+        total = sum(e.size_bytes for e in self._entries.values())
+        for entry in sorted(self._entries.values(), key=lambda e: e.last_accessed):
+            if total <= self.size_limit:
+                break
+            key = (entry.period_start, entry.period_end)
+            if key == keep:
+                continue
+            self._remove_files(entry)
+            del self._entries[key]
+            total -= entry.size_bytes
+
+    def discard(self, period_start: str, period_end: str) -> None:
+        """Delete one cached period if present."""
+        with self._lock:
+            entry = self._entries.pop((period_start, period_end), None)
+            if entry is not None:
+                self._remove_files(entry)
+                self._save_index()
+
+    def discard_overlapping(self, period_start: str, period_end: str) -> None:
+        """Delete every cached period that shares days with the given one."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] < period_end and period_start < k[1]]:
+                self.discard(*key)
+
+    def clear(self) -> None:
+        """Delete every cached period for the account."""
+        with self._lock:
+            for entry in self._entries.values():
+                self._remove_files(entry)
+            self._entries.clear()
+            self.index_path.unlink(missing_ok=True)
+
+
+def is_stale(collected_at: str, now: Optional[datetime] = None) -> bool:
+    """True if data collected at collected_at is older than STALE_AFTER_HOURS.
+
+    Even a closed period changes as mail is trashed or relabeled elsewhere.
+    """
+    if not collected_at:
+        return False
+    now = now or datetime.now()
+    try:
+        age = now - datetime.strptime(collected_at, "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return False
+    return age.total_seconds() > STALE_AFTER_HOURS * 3600
+
+
+def _unlink(path: str) -> None:
+    """Delete a file if the path is set and the file exists."""
+    if path:
+        Path(path).unlink(missing_ok=True)
+
+
+def _now() -> str:
+    """Current local time in the cache's timestamp format."""
+    return datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
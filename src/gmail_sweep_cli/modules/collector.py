@@ -4,17 +4,33 @@ from __future__ import annotations
 
 import email.utils
 from datetime import datetime
-from typing import Dict, List
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 from googleapiclient.discovery import build
 
+from gmail_sweep_cli.modules.auth import save_credentials
 from gmail_sweep_cli.modules.models import AddressInfo, CollectedData
-from gmail_sweep_cli.utils.gmail_api import get_message_metadata, list_all_message_ids
+from gmail_sweep_cli.utils.gmail_api import iter_message_id_pages_partitioned, iter_message_metadata
+from gmail_sweep_cli.utils.spill import ID_STORE_SUFFIX, SpillStore
+from gmail_sweep_cli.utils.throttle import AimdController
+from gmail_sweep_cli.utils.transport import DEFAULT_POOL_SIZE, PooledHttp, SharedCredentials
 
+SPILL_MAX_SUBJECTS = 100
+SPILL_MAX_DATES = 100
+METADATA_HEADERS = ["From", "Subject", "Date"]
 
-def build_gmail_service(credentials):
-    """Build the Gmail API service."""
-    return build("gmail", "v1", credentials=credentials)
+
+def build_gmail_service(credentials, token_path: Optional[Path] = None, pool_size: int = DEFAULT_POOL_SIZE):
+    """Build the Gmail API service on a pooled keep-alive transport.
+
+    The token is refreshed automatically (once, under a lock) whenever it
+    expires during a long run; if token_path is given, the refreshed token
+    is written back to it.
+    """
+    on_refresh = (lambda creds: save_credentials(creds, token_path)) if token_path else None
+    shared = SharedCredentials(credentials, on_refresh=on_refresh)
+    return build("gmail", "v1", http=PooledHttp(shared, size=pool_size))
 
 
 def _parse_from_header(headers: List[Dict]) -> str:
@@ -46,75 +62,268 @@ def _parse_date(headers: List[Dict]) -> str:
     return ""
 
 
-def collect_emails(service, period_start: str, period_end: str) -> CollectedData:
+def _protection(label_ids: List[str]) -> str:
+    """Return "starred" or "important" if deletion must skip the message, else ""."""
+    if "STARRED" in label_ids:
+        return "starred"
+    if "IMPORTANT" in label_ids:
+        return "important"
+    return ""
+
+
+def _received_at(msg: Dict) -> int:
+    """Unix timestamp of a message's internalDate (when Gmail received it)."""
+    return int(msg.get("internalDate", 0)) // 1000
+
+
+def _local_day(timestamp: int) -> str:
+    """Local YYYY-MM-DD day of a Unix timestamp."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def _add_message_id(info: AddressInfo, ids_by_day: Dict[str, List[str]], msg_id: str, protection: str, day: str) -> None:
+    """Record a message id (with its protection flag) under its day."""
+    ids_by_day.setdefault(day, []).append(msg_id)
+    if protection == "starred":
+        info.starred_ids.append(msg_id)
+    elif protection == "important":
+        info.important_ids.append(msg_id)
+
+
+def _aggregate_message(  # pylint: disable=too-many-positional-arguments
+    addresses: Dict[str, AddressInfo], ids_by_day: Dict[str, Dict[str, List[str]]], msg_id: str, msg: Dict, day: str, received_at: int
+) -> None:
+    """Add a fetched message to its sender's aggregates (in-memory collection)."""
+    headers = msg.get("payload", {}).get("headers", [])
+    from_addr = _parse_from_header(headers)
+    subject = _parse_subject(headers)
+    date_str = _parse_date(headers)
+
+    if from_addr not in addresses:
+        addresses[from_addr] = AddressInfo(
+            count=0,
+            frequency_days=0.0,
+            subjects=[],
+            received_dates=[],
+        )
+
+    info = addresses[from_addr]
+    size = int(msg.get("sizeEstimate", 0))
+    info.count += 1
+    info.total_bytes += size
+    _add_message_id(info, ids_by_day.setdefault(from_addr, {}), msg_id, _protection(msg.get("labelIds", [])), day)
+    if subject not in info.subjects:
+        info.subjects.append(subject)
+    info.add_to_day(day, received_at, size, info.subjects.index(subject))
+    if date_str:
+        info.received_dates.append(date_str)
+
+
+def _rate_controller(log: Callable[..., None]) -> AimdController:
+    """Adaptive controller for metadata fetches, reporting its decisions to log.
+
+    Batches are capped at 200 messages so that cancellation and pausing
+    (checked between batches) stay responsive.
+    """
+    return AimdController(max_batch_size=200, report=lambda message: log(f"  {message}"))
+
+
+def _period_bounds(period_start: str, period_end: str) -> Tuple[int, int]:
+    """Unix timestamp range of the period, from local midnight to local midnight.
+
+    The period is queried with these timestamps rather than with dates
+    (which Gmail reads as Pacific time), so that it matches the local days
+    used as histogram keys (see _local_day).
+    """
+    start = datetime.strptime(period_start, "%Y-%m-%d")
+    end = datetime.strptime(period_end, "%Y-%m-%d")
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def _silent(*_args, **_kwargs) -> None:
+    """Progress printer used for background collections."""
+
+
+def _no_checkpoint() -> None:
+    """Checkpoint used when the caller does not need one."""
+
+
+def collect_emails(  # pylint: disable=too-many-positional-arguments
+    service,
+    period_start: str,
+    period_end: str,
+    spill_dir: Optional[Path] = None,
+    memory_limit_mb: Optional[int] = None,
+    checkpoint: Optional[Callable[[], None]] = None,
+    verbose: bool = True,
+) -> CollectedData:
     """Collect emails from Gmail API for the given period.
 
     Args:
         service: Gmail API service instance.
         period_start: Start date in YYYY-MM-DD format.
         period_end: End date in YYYY-MM-DD format.
+        spill_dir: Directory for the on-disk spill store (spill mode only).
+        memory_limit_mb: If set, collect in spill mode: message ids and
+            per-message rows are kept on disk and aggregated in chunks,
+            with the database cache capped at this many megabytes.
+        checkpoint: Called between list pages and between metadata
+            batches (not per request: a batch's requests, up to the
+            controller's concurrency at a time, run to completion first);
+            may block (to yield quota) or raise (to cancel the collection).
+        verbose: Print progress messages.
 
     Returns:
         CollectedData with aggregated address information.
     """
-    query = f"after:{period_start} before:{period_end}"
+    checkpoint = checkpoint or _no_checkpoint
+    log = print if verbose else _silent
+    if memory_limit_mb is not None:
+        return _collect_emails_spilled(service, period_start, period_end, spill_dir or Path("."), memory_limit_mb, checkpoint, log)
+
     addresses: Dict[str, AddressInfo] = {}
+    ids_by_day: Dict[str, Dict[str, List[str]]] = {}
     total_fetched = 0
+    processed = 0
 
-    print(f"Collecting emails from {period_start} to {period_end}...")
+    log(f"Collecting emails from {period_start} to {period_end}...")
 
-    message_ids = list_all_message_ids(service, query)
+    message_ids: Dict[str, None] = {}
+    checkpoint()
+    for page in iter_message_id_pages_partitioned(service, "", *_period_bounds(period_start, period_end)):
+        message_ids.update(dict.fromkeys(page))
+        checkpoint()
     if not message_ids:
-        print("  No messages found.")
-
-    for msg_id in message_ids:
-        msg = get_message_metadata(service, msg_id, ["From", "Subject", "Date"])
-        if msg is None:
-            continue
-
-        headers = msg.get("payload", {}).get("headers", [])
-        from_addr = _parse_from_header(headers)
-        subject = _parse_subject(headers)
-        date_str = _parse_date(headers)
-
-        if from_addr not in addresses:
-            addresses[from_addr] = AddressInfo(
-                count=0,
-                frequency_days=0.0,
-                subjects=[],
-                received_dates=[],
-            )
-
-        info = addresses[from_addr]
-        info.count += 1
-        if subject not in info.subjects:
-            info.subjects.append(subject)
-        if date_str:
-            info.received_dates.append(date_str)
+        log("  No messages found.")
+
+    controller = _rate_controller(log)
+    for batch in iter_message_metadata(service, message_ids, METADATA_HEADERS, controller, checkpoint):
+        processed += len(batch)
+        for msg_id, msg in batch:
+            if msg is None:
+                continue
+            received_at = _received_at(msg)
+            day = _local_day(received_at)
+            if not period_start <= day < period_end:
+                continue
+
+            _aggregate_message(addresses, ids_by_day, msg_id, msg, day, received_at)
+            total_fetched += 1
 
-        total_fetched += 1
-        if total_fetched % 100 == 0:
-            print(f"  {total_fetched} emails processed...")
+        log(f"  {processed}/{len(message_ids)} emails processed ({controller.status()})...")
+
+    # Order message ids by day, so daily_counts doubles as an index into them
+    for from_addr, days in ids_by_day.items():
+        addresses[from_addr].message_ids = [msg_id for day in sorted(days) for msg_id in days[day]]
 
     # Calculate frequency_days for each address
     for info in addresses.values():
         info.received_dates.sort(reverse=True)
-        if info.count >= 2 and len(info.received_dates) >= 2:
-            try:
-                first = datetime.strptime(info.received_dates[-1], "%Y-%m-%d %H:%M:%S")
-                last = datetime.strptime(info.received_dates[0], "%Y-%m-%d %H:%M:%S")
-                span = (last - first).total_seconds() / 86400
-                info.frequency_days = round(span / (info.count - 1), 1) if info.count > 1 else 0.0
-            except (ValueError, TypeError):
-                info.frequency_days = 0.0
-        else:
-            info.frequency_days = 0.0
+        info.frequency_days = info.daily_frequency(sorted(info.daily_counts))
+
+    log(f"Collection complete: {len(addresses)} addresses, {total_fetched} emails.")
+
+    return CollectedData(
+        collected_at=datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        period_start=period_start,
+        period_end=period_end,
+        addresses=addresses,
+        daily_histograms=True,
+    )
+
+
+def _spill_row(msg_id: str, msg: Dict) -> Tuple[str, str, str, str, int, str, str, int]:
+    """Build the spill store row for a fetched message."""
+    headers = msg.get("payload", {}).get("headers", [])
+    received_at = _received_at(msg)
+    return (
+        msg_id,
+        _parse_from_header(headers),
+        _parse_subject(headers),
+        _parse_date(headers),
+        int(msg.get("sizeEstimate", 0)),
+        _protection(msg.get("labelIds", [])),
+        _local_day(received_at),
+        received_at,
+    )
+
+
+def _aggregate_spilled(store: SpillStore) -> Dict[str, AddressInfo]:
+    """Aggregate the spilled rows into per-address information, one sender at a time.
+
+    Message ids stay in the store (see IdStore); only counts, histograms
+    and capped subject and date lists are kept in memory.
+    """
+    addresses: Dict[str, AddressInfo] = {}
+    for _msg_id, from_addr, subject, date_str, size, _flag, day, received_at in store.iter_sender_rows():
+        info = addresses.get(from_addr)
+        if info is None:
+            info = addresses[from_addr] = AddressInfo()
+        info.count += 1
+        info.total_bytes += size
+        if len(info.subjects) < SPILL_MAX_SUBJECTS and subject not in info.subjects:
+            info.subjects.append(subject)
+        info.add_to_day(day, received_at, size, info.subjects.index(subject) if subject in info.subjects else None)
+        if date_str and len(info.received_dates) < SPILL_MAX_DATES:
+            info.received_dates.append(date_str)
+
+    for info in addresses.values():
+        info.frequency_days = info.daily_frequency(sorted(info.daily_counts))
+    return addresses
+
+
+def _collect_emails_spilled(  # pylint: disable=too-many-positional-arguments
+    service,
+    period_start: str,
+    period_end: str,
+    spill_dir: Path,
+    memory_limit_mb: int,
+    checkpoint: Callable[[], None],
+    log: Callable[..., None],
+) -> CollectedData:
+    """Collect emails in spill mode, keeping ids and rows in an on-disk store.
+
+    Only the aggregated result is held in memory; per address it keeps at
+    most SPILL_MAX_SUBJECTS distinct subjects and the SPILL_MAX_DATES most
+    recent received dates (count and frequency still cover every message).
+    Message ids and their flags are not kept in memory: the store is
+    persisted as an IdStore next to the period cache (data.id_store).
+    """
+    total_fetched = 0
+    processed = 0
+
+    log(f"Collecting emails from {period_start} to {period_end} (spill mode, {memory_limit_mb} MB cap)...")
+
+    with SpillStore(spill_dir, memory_limit_mb) as store:
+        checkpoint()
+        for page in iter_message_id_pages_partitioned(service, "", *_period_bounds(period_start, period_end)):
+            store.add_ids(page)
+            checkpoint()
+        total_ids = store.count_ids()
+        if not total_ids:
+            log("  No messages found.")
+
+        controller = _rate_controller(log)
+        for chunk in store.iter_id_chunks():
+            for batch in iter_message_metadata(service, chunk, METADATA_HEADERS, controller, checkpoint):
+                rows = [_spill_row(msg_id, msg) for msg_id, msg in batch if msg is not None]
+                rows = [row for row in rows if period_start <= row[6] < period_end]
+                store.add_rows(rows)
+                total_fetched += len(rows)
+                processed += len(batch)
+                log(f"  {processed}/{total_ids} emails processed ({controller.status()})...")
+
+        addresses = _aggregate_spilled(store)
+        id_store = (spill_dir / f"{period_start}_{period_end}{ID_STORE_SUFFIX}").resolve()
+        store.persist(id_store)
 
-    print(f"Collection complete: {len(addresses)} addresses, {total_fetched} emails.")
+    log(f"Collection complete: {len(addresses)} addresses, {total_fetched} emails.")
 
     return CollectedData(
         collected_at=datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
         period_start=period_start,
         period_end=period_end,
         addresses=addresses,
+        daily_histograms=True,
+        id_store=str(id_store),
     )
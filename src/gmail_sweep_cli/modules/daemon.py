@@ -0,0 +1,149 @@
+"""Unix domain socket server and client for daemon mode.
+
+The protocol is one JSON request line per connection,
+{"op": <name>, "args": {...}}, answered by one JSON response line,
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+This module only uses the standard library so that the client starts fast.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+SHUTDOWN_OP = "shutdown"
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+class DaemonError(Exception):
+    """Raised by the client when the daemon is unreachable or reports an error."""
+
+
+def get_socket_path(cache_dir: str, email: str, socket_path: Optional[str] = None) -> Path:
+    """Return the daemon socket path for the given email."""
+    if socket_path:
+        return Path(socket_path)
+    return Path(cache_dir) / f"{email}.sock"
+
+
+def _read_line(conn: socket.socket, limit: Optional[int] = None) -> bytes:
+    """Read bytes up to the first newline (or EOF, or more than limit bytes)."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if b"\n" in chunk or (limit is not None and size > limit):
+            break
+    return b"".join(chunks).split(b"\n", 1)[0]
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """Remove a socket file left behind by a daemon that is no longer running.
+
+    Raises:
+        OSError: If a daemon is still listening on the socket.
+    """
+    if not path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except ConnectionRefusedError:
+        path.unlink()
+        return
+    finally:
+        probe.close()
+    raise OSError(f"Another daemon is already listening on {path}")
+
+
+def serve(path: Path, handlers: Dict[str, Callable[[Dict[str, Any]], Any]]) -> None:
+    """Serve requests on a Unix domain socket until a shutdown request.
+
+    Requests are handled one at a time, so handlers never run concurrently.
+    A leftover socket file is reused only if no daemon answers on it.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Unix domain sockets are not supported on this platform.")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _remove_stale_socket(path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(str(path))
+    except OSError:
+        server.close()
+        raise
+    try:
+        os.chmod(path, 0o600)
+        server.listen()
+        print(f"Daemon listening on {path}")
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                op = _handle_connection(conn, handlers)
+            if op == SHUTDOWN_OP:
+                break
+    finally:
+        server.close()
+        if path.exists():
+            path.unlink()
+    print("Daemon stopped.")
+
+
+def _handle_connection(conn: socket.socket, handlers: Dict[str, Callable[[Dict[str, Any]], Any]]) -> str:
+    """Handle one request on an accepted connection. Returns the op name."""
+    op = ""
+    try:
+        request = json.loads(_read_line(conn, MAX_REQUEST_BYTES).decode("utf-8"))
+        op = request.get("op", "")
+        if op == SHUTDOWN_OP:
+            response = {"ok": True, "result": None}
+        elif op in handlers:
+            response = {"ok": True, "result": handlers[op](request.get("args") or {})}
+        else:
+            response = {"ok": False, "error": f"Unknown operation: {op}"}
+    except Exception as e:
+        response = {"ok": False, "error": str(e) or e.__class__.__name__}
+    try:
+        conn.sendall(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+    except OSError:
+        pass
+    return op
+
+
+def call(path: Path, op: str, args: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+    """Send one request to the daemon and return its result.
+
+    Raises:
+        DaemonError: If the daemon cannot be reached or the operation failed.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("Unix domain sockets are not supported on this platform.")
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        try:
+            client.connect(str(path))
+        except OSError as e:
+            raise DaemonError(f"Cannot connect to daemon at {path}: {e}") from e
+        request = {"op": op, "args": args or {}}
+        client.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        raw = _read_line(client)
+    finally:
+        client.close()
+
+    if not raw:
+        raise DaemonError("Daemon closed the connection without a response.")
+    response = json.loads(raw.decode("utf-8"))
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "Unknown error"))
+    return response.get("result")
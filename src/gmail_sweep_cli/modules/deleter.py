@@ -3,10 +3,23 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import List, Set
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
 
-from gmail_sweep_cli.utils.gmail_api import execute_with_retry, get_message_metadata, list_all_message_ids
+from gmail_sweep_cli.modules.estimator import ImpactEstimate, total_to_trash
+from gmail_sweep_cli.modules.models import CollectedData
+from gmail_sweep_cli.utils.gmail_api import (
+    batch_trash,
+    BATCH_MODIFY_LIMIT,
+    coalesce_from_queries,
+    extract_email_address,
+    iter_message_metadata,
+    list_message_ids_partitioned,
+)
+from gmail_sweep_cli.utils.spill import IdStore
+from gmail_sweep_cli.utils.throttle import AimdController
 
 
 def _clear_screen() -> None:
@@ -14,6 +27,24 @@ def _clear_screen() -> None:
     os.system("cls" if os.name == "nt" else "clear")
 
 
+def _report_decision(message: str) -> None:
+    """Print a rate control decision between progress lines."""
+    print(f"  {message}")
+
+
+def _trash_controller() -> AimdController:
+    """Adaptive controller for batchModify calls (sequential, chunk size adapts)."""
+    return AimdController(
+        concurrency=1,
+        batch_size=BATCH_MODIFY_LIMIT,
+        max_concurrency=1,
+        min_batch_size=50,
+        max_batch_size=BATCH_MODIFY_LIMIT,
+        batch_step=100,
+        report=_report_decision,
+    )
+
+
 @dataclass
 class DeleteResult:
     """Result of a deletion operation for one address."""
@@ -23,45 +54,111 @@ class DeleteResult:
     skipped_starred: int = 0
     skipped_important: int = 0
     total: int = 0
+    failed: int = 0
+    unattributed: int = 0
+
+
+# Address of the result counting listed messages no marked address could claim
+UNATTRIBUTED = "(unattributed)"
+
+
+def _owner(from_value: str, addresses: Set[str], owner_by_email: Dict[str, str]) -> Optional[str]:
+    """The marked address a message is attributed to, from its From header.
+
+    An exact match of the full From value wins; otherwise the message goes
+    to the first marked address (in sorted order) with the same email, so
+    display-name variants of one sender never count a message twice.
+    """
+    if from_value in addresses:
+        return from_value
+    return owner_by_email.get(extract_email_address(from_value).lower())
+
 
+def _plan_message_ids(service, addresses: List[str], estimates: Dict[str, ImpactEstimate]) -> Dict[str, None]:
+    """List the ids of the messages to process.
 
-def delete_emails_for_addresses(service, addresses: Set[str]) -> List[DeleteResult]:
+    Addresses with exact estimates reuse the listed ids; the rest are packed
+    into coalesced "from:(a OR b ...)" queries. Either way the messages are
+    attributed from the From header fetched during processing (see _owner).
+    """
+    planned: Dict[str, None] = {}
+    to_list: Dict[str, None] = {}
+    for address in addresses:
+        estimate = estimates.get(address)
+        if estimate is not None and estimate.exact:
+            planned.update(dict.fromkeys(estimate.message_ids))
+        else:
+            to_list[extract_email_address(address).lower()] = None
+
+    queries = coalesce_from_queries(to_list)
+    for idx, query in enumerate(queries, 1):
+        print(f"\rListing [{idx}/{len(queries)}]...", end="", flush=True)
+        planned.update(dict.fromkeys(list_message_ids_partitioned(service, query)))
+    if queries:
+        print()
+    return planned
+
+
+def delete_emails_for_addresses(service, addresses: Set[str], estimates: Optional[Dict[str, ImpactEstimate]] = None) -> List[DeleteResult]:
     """Move all emails from the given addresses to trash.
 
-    Skips starred and important emails.
+    Skips starred and important emails. Messages are listed with coalesced
+    multi-sender queries and attributed back to one address each by the From
+    header (the full value first, then the email), so per-address results
+    add up to the emails actually trashed. Listed messages that no address
+    claims (or whose metadata could not be fetched) are left alone and
+    counted in an extra UNATTRIBUTED result.
+    Metadata is fetched concurrently and the remaining messages are trashed
+    in bulk with messages.batchModify, both paced by adaptive controllers.
 
     Args:
         service: Gmail API service instance.
         addresses: Set of From addresses to delete.
+        estimates: Impact estimates from the confirmation screen. Exact
+            estimates carry the message ids, which are used instead of
+            listing the address again.
 
     Returns:
-        List of DeleteResult for each address.
+        List of DeleteResult for each address, plus the UNATTRIBUTED result
+        if any message was left alone.
     """
-    results: List[DeleteResult] = []
-    total_addresses = len(addresses)
-
-    print("Deleting emails...")
+    sorted_addresses = sorted(addresses)
+    results = {address: DeleteResult(address=address) for address in sorted_addresses}
+    owner_by_email: Dict[str, str] = {}
+    for address in sorted_addresses:
+        owner_by_email.setdefault(extract_email_address(address).lower(), address)
 
-    for idx, address in enumerate(sorted(addresses), 1):
-        result = DeleteResult(address=address)
-        # Extract email part for query (handle "Name <email>" format)
-        query_addr = address
-        if "<" in address and ">" in address:
-            query_addr = address[address.index("<") + 1 : address.index(">")]
+    estimates = estimates or {}
+    if estimates:
+        planned = total_to_trash(estimates)
+        approx = "" if all(e.exact for e in estimates.values()) else "about "
+        print(f"Deleting emails ({approx}{planned} to move to Trash)...")
+    else:
+        print("Deleting emails...")
 
-        query = f"from:{query_addr}"
-        all_message_ids = list_all_message_ids(service, query)
-        result.total = len(all_message_ids)
+    message_ids = _plan_message_ids(service, sorted_addresses, estimates)
+    total_messages = len(message_ids)
+    to_trash: Dict[str, str] = {}
+    unattributed = DeleteResult(address=UNATTRIBUTED)
 
-        # Process each message
-        for msg_idx, msg_id in enumerate(all_message_ids):
-            print(f"\r[{idx}/{total_addresses}] {address}: {msg_idx + 1}/{result.total} processing...", end="", flush=True)
-
-            msg = get_message_metadata(service, msg_id, ["From"])
-            if msg is None:
+    # Check each message's sender and labels
+    controller = AimdController(report=_report_decision)
+    processed = 0
+    for batch in iter_message_metadata(service, message_ids, ["From"], controller):
+        for msg_id, msg in batch:
+            owner = None
+            if msg is not None:
+                headers = msg.get("payload", {}).get("headers", [])
+                from_value = next((h["value"] for h in headers if h["name"].lower() == "from"), "")
+                owner = _owner(from_value, addresses, owner_by_email)
+            if owner is None:
+                unattributed.total += 1
+                unattributed.unattributed += 1
                 continue
 
             label_ids = msg.get("labelIds", [])
+            result = results[owner]
+            result.total += 1
 
             if "STARRED" in label_ids:
                 result.skipped_starred += 1
@@ -70,22 +167,97 @@ def delete_emails_for_addresses(service, addresses: Set[str]) -> List[DeleteResu
                 result.skipped_important += 1
                 continue
 
-            # Move to trash
-            trash_request = (
-                service.users()
-                .messages()
-                .trash(
-                    userId="me",
-                    id=msg_id,
-                )
-            )
-            execute_with_retry(trash_request)
-            result.moved += 1
+            to_trash[msg_id] = owner
+
+        processed += len(batch)
+        print(f"  {processed}/{total_messages} processed ({controller.status()})...")
+
+    # Move to trash in bulk
+    if to_trash:
+        print(f"Moving {len(to_trash)} emails to Trash...")
+        failed = set(batch_trash(service, list(to_trash), _trash_controller()))
+        for msg_id, owner in to_trash.items():
+            if msg_id in failed:
+                results[owner].failed += 1
+            else:
+                results[owner].moved += 1
+    ordered = [results[address] for address in sorted_addresses]
+    return ordered + [unattributed] if unattributed.total else ordered
+
+
+@dataclass
+class PeriodDeletePlan:
+    """What a current-period delete will do, built from the stored ids.
+
+    results carry each address's total and skipped counts (moved and failed
+    are filled in by delete_emails_in_period); trash_ids holds the ids to
+    trash.
+    """
+
+    results: List[DeleteResult] = field(default_factory=list)
+    trash_ids: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def to_trash(self) -> int:
+        """Number of emails the delete will move to Trash."""
+        return sum(len(ids) for ids in self.trash_ids.values())
+
+
+def plan_period_delete(data: CollectedData, addresses: Set[str]) -> PeriodDeletePlan:
+    """Plan the deletion of the given addresses' emails in the collected period.
+
+    Uses the message ids and label flags stored at collection time, read
+    from the on-disk id store in spill mode. Starred and important emails
+    are skipped.
+
+    Args:
+        data: Collected data for the current period.
+        addresses: Set of From addresses to delete.
+
+    Returns:
+        PeriodDeletePlan for the addresses, in sorted order.
+    """
+    plan = PeriodDeletePlan()
+    with ExitStack() as stack:
+        id_store = stack.enter_context(IdStore(Path(data.id_store))) if data.id_store else None
+        for address in sorted(addresses):
+            info = data.addresses.get(address)
+            result = DeleteResult(address=address)
+            if info is not None:
+                if id_store is not None:
+                    message_ids, starred_ids, important_ids = id_store.message_ids(address, data.period_start, data.period_end)
+                else:
+                    message_ids, starred_ids, important_ids = info.message_ids, info.starred_ids, info.important_ids
+                protected = set(starred_ids) | set(important_ids)
+                plan.trash_ids[address] = [msg_id for msg_id in message_ids if msg_id not in protected]
+                result.total = len(message_ids)
+                result.skipped_starred = len(starred_ids)
+                result.skipped_important = len(important_ids)
+            plan.results.append(result)
+    return plan
 
-        print()  # newline after progress
-        results.append(result)
 
-    return results
+def delete_emails_in_period(service, plan: PeriodDeletePlan) -> List[DeleteResult]:
+    """Carry out a current-period delete planned with plan_period_delete.
+
+    No listing or metadata calls are made; messages are trashed in bulk
+    with messages.batchModify.
+
+    Args:
+        service: Gmail API service instance.
+        plan: Plan shown on the confirmation screen.
+
+    Returns:
+        List of DeleteResult for each address.
+    """
+    to_trash = [msg_id for ids in plan.trash_ids.values() for msg_id in ids]
+    print(f"Moving {len(to_trash)} emails to Trash...")
+    failed = set(batch_trash(service, to_trash, _trash_controller()))
+    for result in plan.results:
+        ids = plan.trash_ids.get(result.address, [])
+        result.failed = sum(1 for msg_id in ids if msg_id in failed)
+        result.moved = len(ids) - result.failed
+    return plan.results
 
 
 def print_delete_results(results: List[DeleteResult]) -> None:
@@ -96,14 +268,24 @@ def print_delete_results(results: List[DeleteResult]) -> None:
     total_moved = 0
     total_starred = 0
     total_important = 0
+    total_failed = 0
+    total_unattributed = 0
 
     for r in results:
-        print(f"{r.address}: {r.moved} moved, {r.skipped_starred} skipped (starred), {r.skipped_important} skipped (important)")
+        total_unattributed += r.unattributed
+        if r.address == UNATTRIBUTED:
+            print(f"{r.address}: {r.unattributed} skipped (From header matched no marked address, or could not be fetched)")
+            continue
+        failed = f", {r.failed} failed" if r.failed else ""
+        print(f"{r.address}: {r.moved} moved, {r.skipped_starred} skipped (starred), {r.skipped_important} skipped (important){failed}")
         total_moved += r.moved
         total_starred += r.skipped_starred
         total_important += r.skipped_important
+        total_failed += r.failed
 
     print()
-    print(f"Total: {total_moved} moved, {total_starred} skipped (starred), {total_important} skipped (important)")
+    failed = f", {total_failed} failed (not moved; run the delete again)" if total_failed else ""
+    unattributed = f", {total_unattributed} skipped (unattributed)" if total_unattributed else ""
+    print(f"Total: {total_moved} moved, {total_starred} skipped (starred), {total_important} skipped (important){failed}{unattributed}")
     print()
     input("Press Enter to continue...")
@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import os
+from typing import Dict, Optional
 
+from gmail_sweep_cli.modules.cache_store import is_stale
+from gmail_sweep_cli.modules.deleter import PeriodDeletePlan
+from gmail_sweep_cli.modules.estimator import ImpactEstimate, total_to_trash
 from gmail_sweep_cli.modules.models import AppState
 
 
@@ -27,7 +31,10 @@ def display_main_screen(state: AppState) -> None:
     print("=== Gmail Sweep CLI ===")
     print(f"Account: {state.email}")
     print(f"Period: {data.period_start} ~ {data.period_end} ({state.days} days)")
-    print(f"Total: {total_addresses} addresses, {total_emails} emails")
+    stale_label = " (stale, [r] to re-collect)" if is_stale(data.collected_at) else ""
+    print(f"Collected: {data.collected_at}{stale_label}")
+    print(f"Total: {total_addresses} addresses, {total_emails} emails, {_format_bytes(data.total_bytes)}")
+    print(f"Sort: {state.sort_mode}")
     print()
 
     # Page items
@@ -38,7 +45,7 @@ def display_main_screen(state: AppState) -> None:
         no = start_idx + i
         subject_line = _format_subject(info.subjects, 50)
         print(f"{no}. {addr}")
-        print(f"   Count: {info.count} / Freq: {info.frequency_days} days")
+        print(f"   Count: {info.count} / Freq: {info.frequency_days} days / Size: {_format_bytes(info.total_bytes)} (avg {_format_bytes(info.average_bytes)})")
         print(f"   Subject: {subject_line}")
 
     print()
@@ -46,8 +53,8 @@ def display_main_screen(state: AppState) -> None:
     page_end = min(start_idx + state.page_size - 1, total_items)
     print(f"Page {state.current_page}/{state.total_pages} ({start_idx}-{page_end} of {total_items})")
     print()
-    print("[r]Re-collect [prev/next]Period [</>]Page [q]Quit [l]List marked [c]Clear marks")
-    print(f"[all-delete]Execute delete [{start_idx}-{page_end}]Detail")
+    print("[r]Re-collect [prev/next]Period [days N]Period length [</>]Page [sort count/bytes/freq]Sort [q]Quit [l]List marked [c]Clear marks")
+    print(f"[period-delete]Delete in this period [all-delete]Delete in all periods [{start_idx}-{page_end}]Detail")
 
 
 def display_detail_screen(address: str, info, state: AppState) -> None:
@@ -61,6 +68,7 @@ def display_detail_screen(address: str, info, state: AppState) -> None:
     print(f"Address: {address}{mark_label}")
     print(f"Count: {info.count} emails")
     print(f"Frequency: {info.frequency_days} days (average interval)")
+    print(f"Size: {_format_bytes(info.total_bytes)} total, {_format_bytes(info.average_bytes)} average")
     print()
 
     print("--- Received Dates ---")
@@ -95,34 +103,82 @@ def display_marked_list(state: AppState) -> None:
     print()
 
 
-def display_delete_confirmation(state: AppState) -> bool:
-    """Display the delete confirmation screen. Returns True if user confirms."""
-    if not state.marked_addresses:
-        print("No addresses marked for deletion.")
-        return False
+def display_delete_confirmation(state: AppState, estimates: Optional[Dict[str, ImpactEstimate]] = None) -> str:
+    """Display the delete confirmation screen and return the user's answer.
 
+    "Y" confirms; "e" asks for exact all-period counts; anything else cancels.
+    """
     clear_screen()
     print("=== Delete Confirmation ===")
     print("The following addresses are marked for deletion:")
     print()
 
+    estimates = estimates or {}
     for i, addr in enumerate(sorted(state.marked_addresses), 1):
         count = 0
         if state.data and addr in state.data.addresses:
             count = state.data.addresses[addr].count
         print(f"  {i}. {addr} ({count} emails in current period)")
+        if addr in estimates:
+            print(f"     All periods: {_format_estimate(estimates[addr])}")
 
     print()
+    if estimates:
+        exact = all(e.exact for e in estimates.values())
+        approx = "" if exact else "~"
+        total = total_to_trash(estimates)
+        print(f"Estimated impact: {approx}{total} emails will be moved to Trash ({'exact' if exact else 'estimated'} counts).")
+        print()
     print("WARNING: All emails from these addresses (across ALL periods) will be moved to Trash.")
     print("NOTE: Starred and Important emails will be skipped.")
     print()
     print("All emails from marked addresses will be moved to Trash.")
     print("(Starred and Important emails will be skipped)")
 
+    if estimates and not all(e.exact for e in estimates.values()):
+        return input("Are you sure? [Y/e(exact counts)/other]: ").strip()
+    return input("Are you sure? [Y/other]: ").strip()
+
+
+def display_period_delete_confirmation(state: AppState, plan: PeriodDeletePlan) -> bool:
+    """Display the current-period delete confirmation. Returns True if user confirms."""
+    clear_screen()
+    print("=== Delete Confirmation (current period) ===")
+    print(f"Period: {state.period_start} ~ {state.period_end}")
+    print("The following addresses are marked for deletion:")
+    print()
+
+    for i, result in enumerate(plan.results, 1):
+        if not result.total:
+            print(f"  {i}. {result.address} (no emails in current period)")
+            continue
+        to_trash = len(plan.trash_ids.get(result.address, []))
+        print(f"  {i}. {result.address} ({result.total} emails: {to_trash} to Trash, {result.skipped_starred} starred, {result.skipped_important} important)")
+
+    print()
+    print(f"{plan.to_trash} emails from the current period only will be moved to Trash.")
+    print("NOTE: Starred and Important emails (as of collection) will be skipped.")
+
     answer = input("Are you sure? [Y/other]: ").strip()
     return answer == "Y"
 
 
+def _format_estimate(estimate: ImpactEstimate) -> str:
+    """Format an all-period impact estimate for one address."""
+    approx = "" if estimate.exact else "~"
+    return f"{approx}{estimate.total} total, {approx}{estimate.starred} starred, {approx}{estimate.important} important -> {approx}{estimate.to_trash} to Trash"
+
+
+def _format_bytes(size: int) -> str:
+    """Format a byte count with a binary unit (B, KB, MB, GB)."""
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
 def _format_subject(subjects, max_width: int) -> str:
     """Format subject line with truncation and count of additional subjects."""
     if not subjects:
@@ -3,19 +3,63 @@
 from __future__ import annotations
 
 import json
+import os
+import re
 from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
 
+SORT_MODES = ("count", "bytes", "freq")
+
+_DAY_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def day_of(date_str: str) -> str:
+    """Return the YYYY-MM-DD day of a received date, or "" if it was not parsed."""
+    return date_str[:10] if _DAY_PATTERN.match(date_str) else ""
+
+
+def period_days(period_start: str, period_end: str) -> int:
+    """Number of days in the period [period_start, period_end)."""
+    return (datetime.strptime(period_end, "%Y-%m-%d") - datetime.strptime(period_start, "%Y-%m-%d")).days
+
+
+def frequency_days(count: int, first_ts: float, last_ts: float) -> float:
+    """Average interval in days between the first and last message (Unix timestamps)."""
+    if count < 2:
+        return 0.0
+    return round((last_ts - first_ts) / 86400 / (count - 1), 1)
+
 
 @dataclass
-class AddressInfo:
+class AddressInfo:  # pylint: disable=too-many-instance-attributes
     """Aggregated information for a single sender address."""
 
     count: int = 0
     frequency_days: float = 0.0
     subjects: List[str] = field(default_factory=list)
     received_dates: List[str] = field(default_factory=list)
+    total_bytes: int = 0
+    # Ids of every message in the period, ordered by day (so daily_counts
+    # gives each day's slice); starred_ids and important_ids are the subsets
+    # deletion skips (important_ids excludes starred messages). Empty in
+    # spill mode, where the ids stay on disk (CollectedData.id_store).
+    message_ids: List[str] = field(default_factory=list)
+    starred_ids: List[str] = field(default_factory=list)
+    important_ids: List[str] = field(default_factory=list)
+    # Per-day histograms keyed by the local YYYY-MM-DD day of internalDate,
+    # used to derive sub-windows locally: message count, total size,
+    # indices into subjects, and the first/last internalDate (Unix seconds).
+    daily_counts: Dict[str, int] = field(default_factory=dict)
+    daily_bytes: Dict[str, int] = field(default_factory=dict)
+    daily_subjects: Dict[str, List[int]] = field(default_factory=dict)
+    daily_range: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def average_bytes(self) -> int:
+        """Average message size in bytes."""
+        return self.total_bytes // self.count if self.count else 0
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -24,6 +68,14 @@ class AddressInfo:
             "frequency_days": self.frequency_days,
             "subjects": self.subjects,
             "received_dates": self.received_dates,
+            "total_bytes": self.total_bytes,
+            "message_ids": self.message_ids,
+            "starred_ids": self.starred_ids,
+            "important_ids": self.important_ids,
+            "daily_counts": self.daily_counts,
+            "daily_bytes": self.daily_bytes,
+            "daily_subjects": self.daily_subjects,
+            "daily_range": self.daily_range,
         }
 
     @classmethod
@@ -34,6 +86,75 @@ class AddressInfo:
             frequency_days=data.get("frequency_days", 0.0),
             subjects=data.get("subjects", []),
             received_dates=data.get("received_dates", []),
+            total_bytes=data.get("total_bytes", 0),
+            message_ids=data.get("message_ids", []),
+            starred_ids=data.get("starred_ids", []),
+            important_ids=data.get("important_ids", []),
+            daily_counts=data.get("daily_counts", {}),
+            daily_bytes=data.get("daily_bytes", {}),
+            daily_subjects=data.get("daily_subjects", {}),
+            daily_range=data.get("daily_range", {}),
+        )
+
+    def add_to_day(self, day: str, received_at: int, size: int, subject_index: Optional[int]) -> None:
+        """Count one message in the per-day histograms."""
+        self.daily_counts[day] = self.daily_counts.get(day, 0) + 1
+        self.daily_bytes[day] = self.daily_bytes.get(day, 0) + size
+        if subject_index is not None:
+            refs = self.daily_subjects.setdefault(day, [])
+            if subject_index not in refs:
+                refs.append(subject_index)
+        span = self.daily_range.get(day)
+        if span is None:
+            self.daily_range[day] = [received_at, received_at]
+        else:
+            span[0] = min(span[0], received_at)
+            span[1] = max(span[1], received_at)
+
+    def daily_frequency(self, days: List[str]) -> float:
+        """Average interval in days between messages on the given (sorted) days."""
+        count = sum(self.daily_counts[d] for d in days)
+        if count < 2:
+            return 0.0
+        return frequency_days(count, self.daily_range[days[0]][0], self.daily_range[days[-1]][1])
+
+    def rewindow(self, period_start: str, period_end: str) -> Optional[AddressInfo]:
+        """Derive the aggregates for the days in [period_start, period_end).
+
+        Count, size, subjects, frequency and message ids match a collection
+        of the window. received_dates (display only, capped in spill mode)
+        are filtered by their Date header day, which may differ slightly
+        from the day Gmail received the message.
+
+        Returns:
+            AddressInfo for the window, or None if no message falls in it.
+        """
+        all_days = sorted(self.daily_counts)
+        days = [d for d in all_days if period_start <= d < period_end]
+        count = sum(self.daily_counts[d] for d in days)
+        if not count:
+            return None
+
+        refs = sorted({i for d in days for i in self.daily_subjects.get(d, [])})
+        renumber = {old: new for new, old in enumerate(refs)}
+        message_ids: List[str] = []
+        if self.message_ids:
+            offset = sum(self.daily_counts[d] for d in all_days if d < period_start)
+            message_ids = self.message_ids[offset : offset + count]
+        id_set = set(message_ids)
+        return AddressInfo(
+            count=count,
+            frequency_days=self.daily_frequency(days),
+            subjects=[self.subjects[i] for i in refs],
+            received_dates=[r for r in self.received_dates if period_start <= day_of(r) < period_end],
+            total_bytes=sum(self.daily_bytes.get(d, 0) for d in days),
+            message_ids=message_ids,
+            starred_ids=[m for m in self.starred_ids if m in id_set],
+            important_ids=[m for m in self.important_ids if m in id_set],
+            daily_counts={d: self.daily_counts[d] for d in days},
+            daily_bytes={d: self.daily_bytes[d] for d in days if d in self.daily_bytes},
+            daily_subjects={d: [renumber[i] for i in self.daily_subjects[d]] for d in days if d in self.daily_subjects},
+            daily_range={d: self.daily_range[d] for d in days},
         )
 
 
@@ -45,6 +166,11 @@ class CollectedData:
     period_start: str = ""
     period_end: str = ""
     addresses: Dict[str, AddressInfo] = field(default_factory=dict)
+    # True if the addresses carry per-day histograms (see AddressInfo.rewindow)
+    daily_histograms: bool = False
+    # Spill mode: path of the IdStore holding the message ids and flags
+    id_store: str = ""
+    _orderings: Dict[str, List[tuple]] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -55,6 +181,8 @@ class CollectedData:
                 "end": self.period_end,
             },
             "addresses": {addr: info.to_dict() for addr, info in self.addresses.items()},
+            "daily_histograms": self.daily_histograms,
+            "id_store": self.id_store,
         }
 
     @classmethod
@@ -68,13 +196,21 @@ class CollectedData:
             period_start=period.get("start", ""),
             period_end=period.get("end", ""),
             addresses=addresses,
+            daily_histograms=data.get("daily_histograms", False),
+            id_store=data.get("id_store", ""),
         )
 
     def save(self, path: Path) -> None:
-        """Save collected data to JSON file."""
+        """Save collected data to JSON file.
+
+        Written to a temporary file first and moved into place, so an
+        interrupted write never leaves a truncated file behind.
+        """
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
 
     @classmethod
     def load(cls, path: Path) -> Optional[CollectedData]:
@@ -85,15 +221,65 @@ class CollectedData:
             data = json.load(f)
         return cls.from_dict(data)
 
-    def sorted_addresses(self) -> List[tuple]:
-        """Return addresses sorted by count descending."""
-        return sorted(self.addresses.items(), key=lambda x: x[1].count, reverse=True)
+    def sorted_addresses(self, mode: str = "count") -> List[tuple]:
+        """Return addresses in the given sort order.
+
+        Modes: "count" (most emails first), "bytes" (largest total size
+        first) and "freq" (shortest average interval first; senders with a
+        single email last). Orderings are computed once and reused until
+        invalidate_orderings() is called.
+        """
+        if mode not in self._orderings:
+            items = self.addresses.items()
+            if mode == "bytes":
+                ordering = sorted(items, key=lambda x: (x[1].total_bytes, x[1].count), reverse=True)
+            elif mode == "freq":
+                ordering = sorted(items, key=lambda x: (x[1].frequency_days <= 0, x[1].frequency_days, -x[1].count))
+            elif mode == "count":
+                ordering = sorted(items, key=lambda x: x[1].count, reverse=True)
+            else:
+                raise ValueError(f"Unknown sort mode: {mode}")
+            self._orderings[mode] = ordering
+        return self._orderings[mode]
+
+    def covers(self, period_start: str, period_end: str) -> bool:
+        """True if the given period can be derived locally with rewindow()."""
+        return self.daily_histograms and self.period_start <= period_start and period_end <= self.period_end
+
+    def rewindow(self, period_start: str, period_end: str) -> CollectedData:
+        """Derive the data for a sub-period from the per-day histograms.
+
+        No API calls are made; collected_at is kept, so staleness carries
+        over. Callers should check covers() first.
+        """
+        addresses = {}
+        for addr, info in self.addresses.items():
+            sub = info.rewindow(period_start, period_end)
+            if sub is not None:
+                addresses[addr] = sub
+        return CollectedData(
+            collected_at=self.collected_at,
+            period_start=period_start,
+            period_end=period_end,
+            addresses=addresses,
+            daily_histograms=True,
+            id_store=self.id_store,
+        )
+
+    def invalidate_orderings(self) -> None:
+        """Drop precomputed orderings after the addresses have changed."""
+        self._orderings.clear()
 
     @property
     def total_emails(self) -> int:
         """Total number of emails across all addresses."""
         return sum(info.count for info in self.addresses.values())
 
+    @property
+    def total_bytes(self) -> int:
+        """Total size in bytes across all addresses."""
+        return sum(info.total_bytes for info in self.addresses.values())
+
 
 @dataclass
 class AppState:  # pylint: disable=too-many-instance-attributes
@@ -108,6 +294,8 @@ class AppState:  # pylint: disable=too-many-instance-attributes
     current_page: int = 1
     page_size: int = 10
     shift_count: int = 0
+    memory_limit_mb: Optional[int] = None
+    sort_mode: str = "count"
 
     @property
     def total_pages(self) -> int:
@@ -121,7 +309,7 @@ class AppState:  # pylint: disable=too-many-instance-attributes
         """Get items for the current page."""
         if not self.data:
             return []
-        sorted_items = self.data.sorted_addresses()
+        sorted_items = self.data.sorted_addresses(self.sort_mode)
         start = (self.current_page - 1) * self.page_size
         end = start + self.page_size
         return sorted_items[start:end]
@@ -0,0 +1,194 @@
+"""Background prefetching of adjacent collection periods."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from gmail_sweep_cli.modules.models import CollectedData, period_days
+
+PERIOD_CACHE_SIZE = 8
+# How often (seconds) a paused background collection checks for cancellation
+PAUSE_POLL_INTERVAL = 0.1
+
+Period = Tuple[str, str]
+
+
+class CollectionCancelled(Exception):
+    """Raised inside a background collection when it has been cancelled."""
+
+
+class PeriodCache:
+    """Thread-safe in-memory LRU cache of CollectedData keyed by period."""
+
+    def __init__(self, capacity: int = PERIOD_CACHE_SIZE):
+        self.capacity = capacity
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, period: Period) -> Optional[CollectedData]:
+        """Return cached data for the period (marking it recently used), or None."""
+        with self._lock:
+            data = self._items.get(period)
+            if data is not None:
+                self._items.move_to_end(period)
+            return data
+
+    def put(self, data: CollectedData) -> None:
+        """Insert data under its own period, evicting the least recently used."""
+        period = (data.period_start, data.period_end)
+        with self._lock:
+            self._items[period] = data
+            self._items.move_to_end(period)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def find_covering(self, period_start: str, period_end: str) -> Optional[CollectedData]:
+        """Return the shortest cached data that can be re-windowed to the period, or None."""
+        with self._lock:
+            candidates = [data for data in self._items.values() if data.covers(period_start, period_end)]
+            if not candidates:
+                return None
+            data = min(candidates, key=lambda d: period_days(d.period_start, d.period_end))
+            self._items.move_to_end((data.period_start, data.period_end))
+            return data
+
+    def discard_overlapping(self, period_start: str, period_end: str) -> None:
+        """Remove every cached period that shares days with the given one."""
+        with self._lock:
+            for period in [p for p in self._items if p[0] < period_end and period_start < p[1]]:
+                del self._items[period]
+
+    def clear(self) -> None:
+        """Remove all cached periods."""
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, period: Period) -> bool:
+        with self._lock:
+            return period in self._items
+
+
+class Prefetcher:  # pylint: disable=too-many-instance-attributes
+    """Collects periods on a background thread into a PeriodCache.
+
+    Cancellation policy: scheduling a new set of periods drops pending
+    periods that are no longer wanted and cancels the in-flight collection
+    if its period is not among them. While foreground work is running
+    (see foreground()), the background collection pauses at its next
+    checkpoint: after the current list page or metadata batch, whose
+    requests (up to the controller's concurrency at a time) still finish.
+    """
+
+    def __init__(self, collect: Callable[[str, str, Callable[[], None]], CollectedData], cache: PeriodCache):
+        self._collect = collect
+        self.cache = cache
+        self._pending: List[Period] = []
+        self._in_flight: Optional[Period] = None
+        self._cancel = threading.Event()
+        self._foreground_idle = threading.Event()
+        self._foreground_idle.set()
+        self._foreground_depth = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="gmail-sweep-prefetch", daemon=True)
+        self._thread.start()
+
+    def schedule(self, periods: List[Period]) -> None:
+        """Replace the prefetch queue with the given periods, in priority order."""
+        with self._cond:
+            self._pending = [p for p in periods if p not in self.cache and p != self._in_flight]
+            if self._in_flight is not None and self._in_flight not in periods:
+                self._cancel.set()
+            self._cond.notify_all()
+
+    def cancel_all(self, wait: bool = False) -> None:
+        """Drop all pending periods and cancel the in-flight collection.
+
+        With wait=True, returns only once the in-flight collection has
+        finished or stopped, so it can no longer write to any cache.
+        """
+        with self._cond:
+            self._pending = []
+            if self._in_flight is not None:
+                self._cancel.set()
+            self._cond.notify_all()
+            while wait and self._in_flight is not None:
+                self._cond.wait()
+
+    def shutdown(self) -> None:
+        """Cancel all work and wait for the worker thread to stop."""
+        with self._cond:
+            self._stopped = True
+        self.cancel_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def take(self, period: Period) -> Optional[CollectedData]:
+        """Return prefetched data for the period, or None.
+
+        If the period is being collected right now, waits for it to finish
+        (the background collection prints no progress, so say so first).
+        """
+        with self._cond:
+            if self._in_flight == period:
+                print(f"Waiting for background collection of {period[0]} to {period[1]}...")
+            while self._in_flight == period:
+                self._cond.wait()
+        return self.cache.get(period)
+
+    @contextmanager
+    def foreground(self) -> Iterator[None]:
+        """Pause background collection while the block runs."""
+        with self._cond:
+            self._foreground_depth += 1
+            self._foreground_idle.clear()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._foreground_depth -= 1
+                if self._foreground_depth == 0:
+                    self._foreground_idle.set()
+
+    def _checkpoint(self) -> None:
+        """Called by the background collection between list pages and metadata batches.
+
+        Blocks while foreground work runs, and raises once cancelled (also
+        while paused, so cancel_all(wait=True) works inside foreground()).
+        """
+        while True:
+            if self._cancel.is_set():
+                raise CollectionCancelled()
+            if self._foreground_idle.wait(PAUSE_POLL_INTERVAL):
+                break
+        if self._cancel.is_set():
+            raise CollectionCancelled()
+
+    def _run(self) -> None:
+        """Worker loop: collect pending periods one at a time."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                period = self._pending.pop(0)
+                if period in self.cache:
+                    continue
+                self._in_flight = period
+                self._cancel.clear()
+            try:
+                data = self._collect(period[0], period[1], self._checkpoint)
+                self.cache.put(data)
+            except CollectionCancelled:
+                pass
+            except Exception:
+                # Background failures are not fatal; the foreground will collect on demand
+                pass
+            finally:
+                with self._cond:
+                    self._in_flight = None
+                    self._cond.notify_all()
@@ -3,20 +3,50 @@
 from __future__ import annotations
 
 import time
-from typing import List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from email.utils import parseaddr
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from googleapiclient.errors import HttpError
 
+from gmail_sweep_cli.utils.throttle import AimdController
+
 MAX_RETRIES = 3
 BACKOFF_BASE = 2
 
+# Partitioned listing: number of concurrent list calls, the estimated
+# result size above which a time range is split, how many sub-ranges it is
+# split into, and the smallest range (seconds) that is still split.
+LIST_WORKERS = 4
+PARTITION_TARGET = 1000
+PARTITION_SPLIT = 4
+MIN_PARTITION_SECONDS = 3600
+
+# Maximum number of ids per messages.batchModify call
+BATCH_MODIFY_LIMIT = 1000
+
+# Longest coalesced "from:(a OR b ...)" query, leaving room for partition bounds
+MAX_QUERY_LENGTH = 1000
+
+
+def execute_with_retry(request, retries: int = MAX_RETRIES, controller: Optional[AimdController] = None):
+    """Execute a Gmail API request with exponential backoff.
 
-def execute_with_retry(request, retries: int = MAX_RETRIES):
-    """Execute a Gmail API request with exponential backoff."""
+    If a controller is given, every attempt's latency and status is
+    reported to it.
+    """
     for attempt in range(retries):
+        started = time.monotonic()
         try:
-            return request.execute()
+            result = request.execute()
+            if controller:
+                controller.record(time.monotonic() - started)
+            return result
         except HttpError as e:
+            if controller:
+                controller.record(time.monotonic() - started, e.resp.status)
             if e.resp.status in (429, 500, 503):
                 wait = BACKOFF_BASE ** (attempt + 1)
                 reason = "Rate limited" if e.resp.status == 429 else "Server error"
@@ -25,6 +55,8 @@ def execute_with_retry(request, retries: int = MAX_RETRIES):
             else:
                 raise
         except Exception:
+            if controller:
+                controller.record(time.monotonic() - started, 0)
             if attempt < retries - 1:
                 wait = BACKOFF_BASE ** (attempt + 1)
                 print(f"  Network error. Retrying in {wait}s...")
@@ -34,51 +66,179 @@ def execute_with_retry(request, retries: int = MAX_RETRIES):
     return None
 
 
-def list_all_message_ids(service, query: str) -> List[str]:
-    """Fetch all message IDs matching a Gmail query.
+def extract_email_address(address: str) -> str:
+    """Return the bare email part of a From value ("Name <email>", "email (Name)", ...)."""
+    return parseaddr(address)[1] or address.strip()
+
+
+def coalesce_from_queries(emails: Iterable[str], max_length: int = MAX_QUERY_LENGTH) -> List[str]:
+    """Pack sender emails into as few "from:(a OR b ...)" queries as possible.
+
+    Each query stays within max_length characters; an email too long to
+    share a query gets one of its own.
+    """
+    queries: List[str] = []
+    terms: List[str] = []
+    length = len("from:()")
+    for email in emails:
+        extra = len(email) + (len(" OR ") if terms else 0)
+        if terms and length + extra > max_length:
+            queries.append(f"from:({' OR '.join(terms)})")
+            terms, length = [], len("from:()")
+            extra = len(email)
+        terms.append(email)
+        length += extra
+    if terms:
+        queries.append(f"from:({' OR '.join(terms)})")
+    return queries
+
+
+def estimate_result_size(service, query: str) -> int:
+    """Return Gmail's resultSizeEstimate for a query (a single list call)."""
+    request = service.users().messages().list(userId="me", q=query, maxResults=1)
+    result = execute_with_retry(request) or {}
+    return int(result.get("resultSizeEstimate", 0))
+
+
+def _list_page(service, query: str, page_token: Optional[str]) -> Dict:
+    """Fetch one page of messages.list results."""
+    request = (
+        service.users()
+        .messages()
+        .list(
+            userId="me",
+            q=query,
+            maxResults=500,
+            pageToken=page_token,
+        )
+    )
+    return execute_with_retry(request) or {}
+
+
+def iter_message_id_pages(service, query: str) -> Iterator[List[str]]:
+    """Yield pages of message IDs matching a Gmail query.
 
     Args:
         service: Gmail API service instance.
         query: Gmail search query string.
 
-    Returns:
-        List of message ID strings.
+    Yields:
+        Lists of message ID strings, one per result page.
     """
     page_token: Optional[str] = None
-    message_ids: List[str] = []
 
     while True:
-        request = (
-            service.users()
-            .messages()
-            .list(
-                userId="me",
-                q=query,
-                maxResults=500,
-                pageToken=page_token,
-            )
-        )
-        result = execute_with_retry(request)
-        if result is None:
-            break
+        result = _list_page(service, query, page_token)
         messages = result.get("messages", [])
         if not messages:
             break
-        message_ids.extend(m["id"] for m in messages)
+        yield [m["id"] for m in messages]
         page_token = result.get("nextPageToken")
         if not page_token:
             break
 
+
+def list_all_message_ids(service, query: str) -> List[str]:
+    """Fetch all message IDs matching a Gmail query.
+
+    Args:
+        service: Gmail API service instance.
+        query: Gmail search query string.
+
+    Returns:
+        List of message ID strings.
+    """
+    message_ids: List[str] = []
+    for page in iter_message_id_pages(service, query):
+        message_ids.extend(page)
     return message_ids
 
 
-def get_message_metadata(service, msg_id: str, metadata_headers: Optional[List[str]] = None):
+def _split_range(after_ts: int, before_ts: int, parts: int) -> List[Tuple[int, int]]:
+    """Split [after_ts, before_ts) into consecutive sub-ranges."""
+    step = max(1, (before_ts - after_ts + parts - 1) // parts)
+    return [(lo, min(lo + step, before_ts)) for lo in range(after_ts, before_ts, step)]
+
+
+def iter_message_id_pages_partitioned(
+    service,
+    query: str,
+    after_ts: Optional[int] = None,
+    before_ts: Optional[int] = None,
+    workers: int = LIST_WORKERS,
+) -> Iterator[List[str]]:
+    """Yield pages of message IDs, listing time partitions concurrently.
+
+    messages.list pagination is sequential, so the time range is split into
+    partitions that are paged in parallel. A partition whose first page
+    reports more than PARTITION_TARGET results is split again; small
+    queries therefore still cost a single call. Partitions overlap by one
+    second, so pages may contain duplicate IDs that callers must drop.
+    The query is kept as-is and ANDed with each partition's bounds.
+
+    Args:
+        service: Gmail API service instance.
+        query: Gmail search query string.
+        after_ts: Range start as a Unix timestamp (default: the epoch).
+        before_ts: Range end as a Unix timestamp (default: tomorrow).
+        workers: Number of concurrent list calls.
+
+    Yields:
+        Lists of message ID strings, one per result page.
+    """
+    after_ts = 0 if after_ts is None else after_ts
+    before_ts = int(time.time()) + 86400 if before_ts is None else before_ts
+
+    def fetch(bounds: Tuple[int, int], page_token: Optional[str]) -> Dict:
+        lo, hi = bounds
+        return _list_page(service, f"{query} after:{max(lo - 1, 0)} before:{hi + 1}", page_token)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(fetch, (after_ts, before_ts), None): ((after_ts, before_ts), None)}
+        while pending:
+            done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                bounds, page_token = pending.pop(future)
+                result = future.result()
+                ids = [m["id"] for m in result.get("messages", [])]
+                next_token = result.get("nextPageToken")
+                lo, hi = bounds
+                if page_token is None and next_token and result.get("resultSizeEstimate", 0) > PARTITION_TARGET and hi - lo > MIN_PARTITION_SECONDS:
+                    for sub in _split_range(lo, hi, PARTITION_SPLIT):
+                        pending[pool.submit(fetch, sub, None)] = (sub, None)
+                    next_token = None
+                if ids:
+                    yield ids
+                if next_token:
+                    pending[pool.submit(fetch, bounds, next_token)] = (bounds, next_token)
+
+
+def list_message_ids_partitioned(service, query: str, after_ts: Optional[int] = None, before_ts: Optional[int] = None) -> List[str]:
+    """Fetch all message IDs matching a query using partitioned listing.
+
+    Args:
+        service: Gmail API service instance.
+        query: Gmail search query string.
+        after_ts: Range start as a Unix timestamp (default: the epoch).
+        before_ts: Range end as a Unix timestamp (default: tomorrow).
+
+    Returns:
+        List of distinct message ID strings.
+    """
+    seen: Dict[str, None] = {}
+    for page in iter_message_id_pages_partitioned(service, query, after_ts, before_ts):
+        seen.update(dict.fromkeys(page))
+    return list(seen)
+
+
+def get_message_metadata(service, msg_id: str, metadata_headers: Optional[List[str]] = None, controller: Optional[AimdController] = None):
     """Fetch a single message's metadata.
 
     Args:
         service: Gmail API service instance.
         msg_id: Message ID.
         metadata_headers: List of header names to fetch (e.g. ["From", "Subject", "Date"]).
+        controller: Adaptive controller to report the call to.
 
     Returns:
         Message resource dict, or None on failure.
@@ -92,4 +252,78 @@ def get_message_metadata(service, msg_id: str, metadata_headers: Optional[List[s
         kwargs["metadataHeaders"] = metadata_headers
 
     request = service.users().messages().get(**kwargs)
-    return execute_with_retry(request)
+    return execute_with_retry(request, controller=controller)
+
+
+def iter_message_metadata(
+    service,
+    message_ids: Iterable[str],
+    metadata_headers: List[str],
+    controller: AimdController,
+    checkpoint: Optional[Callable[[], None]] = None,
+) -> Iterator[List[Tuple[str, Optional[Dict]]]]:
+    """Fetch metadata for many messages concurrently, paced by a controller.
+
+    Messages are taken in batches of controller.batch_size; within a batch
+    at most controller.concurrency requests are in flight. Both limits are
+    re-read as the controller adapts them.
+
+    Args:
+        service: Gmail API service instance.
+        message_ids: IDs of the messages to fetch.
+        metadata_headers: List of header names to fetch.
+        controller: Adaptive controller setting the limits.
+        checkpoint: Called before each batch; may block or raise.
+
+    Yields:
+        Lists of (message ID, message resource or None), one per batch, in input order.
+    """
+    remaining = iter(message_ids)
+    with ThreadPoolExecutor(max_workers=controller.max_concurrency) as pool:
+        while True:
+            if checkpoint:
+                checkpoint()
+            batch = list(islice(remaining, controller.batch_size))
+            if not batch:
+                return
+            queued = iter(batch)
+            pending: Dict = {}
+            results: Dict[str, Optional[Dict]] = {}
+            while True:
+                for msg_id in islice(queued, max(0, controller.concurrency - len(pending))):
+                    pending[pool.submit(get_message_metadata, service, msg_id, metadata_headers, controller)] = msg_id
+                if not pending:
+                    break
+                done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+            yield [(msg_id, results[msg_id]) for msg_id in batch]
+
+
+def batch_trash(service, message_ids: List[str], controller: Optional[AimdController] = None) -> List[str]:
+    """Move messages to Trash with messages.batchModify, in chunks.
+
+    A chunk whose call still fails after the retries is reported and
+    skipped; the remaining chunks are still sent.
+
+    Args:
+        service: Gmail API service instance.
+        message_ids: IDs of the messages to trash.
+        controller: Adaptive controller; its batch size (capped at
+            BATCH_MODIFY_LIMIT) sets the chunk size.
+
+    Returns:
+        IDs of the messages that could not be moved to Trash.
+    """
+    failed: List[str] = []
+    done = 0
+    while done < len(message_ids):
+        size = min(controller.batch_size, BATCH_MODIFY_LIMIT) if controller else BATCH_MODIFY_LIMIT
+        chunk = message_ids[done : done + size]
+        request = service.users().messages().batchModify(userId="me", body={"ids": chunk, "addLabelIds": ["TRASH"]})
+        # batchModify returns an empty body on success; None means the retries ran out
+        if execute_with_retry(request, controller=controller) is None:
+            print(f"  Failed to move {len(chunk)} emails to Trash.")
+            failed.extend(chunk)
+        done += len(chunk)
+    return failed
@@ -0,0 +1,146 @@
+"""On-disk (SQLite) spill store for collecting very large mailboxes."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1000
+ID_STORE_SUFFIX = ".ids.sqlite3"
+SPILL_PREFIX = "spill_"
+# Spill files untouched for this long belong to a process that died mid-collection
+STALE_SPILL_SECONDS = 6 * 3600
+
+
+def remove_stale_spill_files(directory: Path, max_age: float = STALE_SPILL_SECONDS) -> None:
+    """Delete spill databases left behind in directory by interrupted collections.
+
+    A file is only removed once it has not been written for max_age
+    seconds, so a collection running in another process keeps its file.
+    """
+    if not directory.is_dir():
+        return
+    cutoff = time.time() - max_age
+    for path in directory.glob(f"{SPILL_PREFIX}*.sqlite3*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+class SpillStore:
+    """Temporary SQLite database holding message ids and per-message rows.
+
+    Keeps memory usage bounded: SQLite's page cache is capped at
+    memory_limit_mb, and callers read ids and rows back in fixed-size chunks.
+    The database file is removed on close unless persist() was called.
+    """
+
+    def __init__(self, directory: Path, memory_limit_mb: int):
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix=SPILL_PREFIX, suffix=".sqlite3", dir=directory)
+        os.close(fd)
+        self.path = Path(name)
+        self._persist_path: Optional[Path] = None
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(f"PRAGMA cache_size = -{max(1, memory_limit_mb) * 1024}")
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute("PRAGMA temp_store = FILE")
+        self._conn.execute("CREATE TABLE ids (id TEXT PRIMARY KEY)")
+        self._conn.execute(
+            "CREATE TABLE rows (id TEXT PRIMARY KEY, sender TEXT, subject TEXT, date TEXT, size INTEGER, protection TEXT, day TEXT, received INTEGER)"
+        )
+
+    def __enter__(self) -> SpillStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def persist(self, path: Path) -> None:
+        """Keep the rows as an IdStore at path when the store is closed."""
+        self._persist_path = path
+
+    def close(self) -> None:
+        """Close the database and delete its file (or move it, see persist())."""
+        if self._persist_path is not None:
+            self._conn.execute("DROP TABLE ids")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS rows_sender_day ON rows (sender, day)")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+        self._conn.close()
+        if self._persist_path is not None:
+            os.replace(self.path, self._persist_path)
+        elif self.path.exists():
+            self.path.unlink()
+
+    def add_ids(self, message_ids: Iterable[str]) -> None:
+        """Store message ids, ignoring duplicates."""
+        self._conn.executemany("INSERT OR IGNORE INTO ids (id) VALUES (?)", ((i,) for i in message_ids))
+        self._conn.commit()
+
+    def count_ids(self) -> int:
+        """Number of distinct stored message ids."""
+        return self._conn.execute("SELECT COUNT(*) FROM ids").fetchone()[0]
+
+    def iter_id_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+        """Yield stored message ids in chunks of at most chunk_size."""
+        last_rowid = 0
+        while True:
+            rows = self._conn.execute("SELECT rowid, id FROM ids WHERE rowid > ? ORDER BY rowid LIMIT ?", (last_rowid, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [r[1] for r in rows]
+
+    def add_rows(self, rows: Iterable[Tuple[str, str, str, str, int, str, str, int]]) -> None:
+        """Store (id, sender, subject, date, size, protection, day, received) rows."""
+        self._conn.executemany("INSERT OR REPLACE INTO rows (id, sender, subject, date, size, protection, day, received) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._conn.commit()
+
+    def iter_sender_rows(self) -> Iterator[Tuple[str, str, str, str, int, str, str, int]]:
+        """Yield (id, sender, subject, date, size, protection, day, received) rows grouped by sender, newest first."""
+        self._conn.execute("CREATE INDEX IF NOT EXISTS rows_sender_date ON rows (sender, date)")
+        cursor = self._conn.execute("SELECT id, sender, subject, date, size, protection, day, received FROM rows ORDER BY sender, date DESC")
+        while True:
+            chunk = cursor.fetchmany(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield from chunk
+
+
+class IdStore:
+    """Read-only view of the message ids a spill-mode collection kept on disk.
+
+    Spill mode does not hold message ids in memory or in the period cache
+    JSON; period deletion reads them from here, one sender at a time.
+    """
+
+    def __init__(self, path: Path):
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def __enter__(self) -> IdStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._conn.close()
+
+    def message_ids(self, sender: str, period_start: str, period_end: str) -> Tuple[List[str], List[str], List[str]]:
+        """Return (all, starred, important) ids of a sender's messages on days in [period_start, period_end)."""
+        ids: List[str] = []
+        starred: List[str] = []
+        important: List[str] = []
+        cursor = self._conn.execute("SELECT id, protection FROM rows WHERE sender = ? AND day >= ? AND day < ?", (sender, period_start, period_end))
+        for msg_id, protection in cursor:
+            ids.append(msg_id)
+            if protection == "starred":
+                starred.append(msg_id)
+            elif protection == "important":
+                important.append(msg_id)
+        return ids, starred, important
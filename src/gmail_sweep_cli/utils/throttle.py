@@ -0,0 +1,149 @@
+"""Adaptive request pacing (AIMD) driven by observed latency and throttling."""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+from gmail_sweep_cli.utils.transport import DEFAULT_POOL_SIZE
+
+# Fewest observations a decision is based on
+MIN_WINDOW = 8
+# Share of failed requests (5xx / network) in a window that triggers a decrease
+MAX_ERROR_RATE = 0.05
+DECREASE_FACTOR = 0.5
+# Average latency above baseline * LATENCY_TOLERANCE holds the current limits
+LATENCY_TOLERANCE = 2.0
+# Per-window growth of the latency baseline, so it follows slow drifts
+BASELINE_DRIFT = 1.05
+
+
+class AimdController:  # pylint: disable=too-many-instance-attributes
+    """Additive-increase / multiplicative-decrease limits for API calls.
+
+    Calls report their latency and HTTP status through record(). After each
+    window of observations (at least MIN_WINDOW and twice the concurrency),
+    the controller:
+
+    - halves concurrency and batch size if any request was rate limited
+      (429) or more than MAX_ERROR_RATE failed with 5xx or network errors,
+      except in the window right after a decrease (requests sent at the
+      old rate are still coming back);
+    - holds them if the average latency exceeds LATENCY_TOLERANCE times
+      the lowest recent average (the server is queueing our requests);
+    - otherwise raises concurrency by 1 and batch size by batch_step.
+
+    Decreases and the start of a hold are passed to the report callback;
+    increases only show up in status(), which callers put in their progress
+    lines. What "batch" means is up to the caller: the number of messages
+    fetched between progress updates, or the ids per batchModify call.
+    Thread-safe.
+    """
+
+    def __init__(  # pylint: disable=too-many-positional-arguments
+        self,
+        concurrency: int = 2,
+        batch_size: int = 50,
+        max_concurrency: int = DEFAULT_POOL_SIZE,
+        min_batch_size: int = 10,
+        max_batch_size: int = 500,
+        batch_step: Optional[int] = None,
+        report: Optional[Callable[[str], None]] = None,
+    ):
+        """Create a controller.
+
+        Args:
+            concurrency: Initial number of requests in flight.
+            batch_size: Initial batch size.
+            max_concurrency: Upper bound for concurrency; keep it at or
+                below the HTTP connection pool size.
+            min_batch_size: Lower bound for the batch size.
+            max_batch_size: Upper bound for the batch size.
+            batch_step: Additive batch size increase (default: min_batch_size).
+            report: Called with a message when the limits decrease or
+                start holding.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = min(max(1, concurrency), self.max_concurrency)
+        self.min_batch_size = max(1, min_batch_size)
+        self.max_batch_size = max(self.min_batch_size, max_batch_size)
+        self.batch_size = min(max(batch_size, self.min_batch_size), self.max_batch_size)
+        self.batch_step = batch_step or self.min_batch_size
+        self.last_decision = ""
+        self._report = report
+        self._lock = threading.Lock()
+        self._baseline: Optional[float] = None
+        self._settling = False
+        self._holding = False
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        """Start a new observation window."""
+        self._samples = 0
+        self._throttled = 0
+        self._errors = 0
+        self._latency_sum = 0.0
+
+    def status(self) -> str:
+        """Current limits, for progress output."""
+        return f"concurrency {self.concurrency}, batch {self.batch_size}"
+
+    def record(self, latency: float, status: int = 200) -> None:
+        """Record one request attempt.
+
+        Args:
+            latency: Seconds the attempt took.
+            status: HTTP status code, or 0 for a network error.
+        """
+        with self._lock:
+            self._samples += 1
+            self._latency_sum += latency
+            if status == 429:
+                self._throttled += 1
+            elif status == 0 or status >= 500:
+                self._errors += 1
+            if self._samples < max(MIN_WINDOW, 2 * self.concurrency):
+                return
+            message = self._decide()
+        if message and self._report:
+            self._report(message)
+
+    def _decide(self) -> str:
+        """Adjust the limits from the finished window.
+
+        Returns a message for decreases and for the first window of a hold;
+        increases are only visible through status().
+        """
+        average = self._latency_sum / self._samples
+        error_rate = self._errors / self._samples
+        concurrency, batch_size = self.concurrency, self.batch_size
+        was_holding, self._holding = self._holding, False
+
+        failing = self._throttled or error_rate > MAX_ERROR_RATE
+        message = ""
+        if failing and self._settling:
+            self._settling = False
+            self._holding = True
+            message = f"Rate control holding (settling after a decrease): {self.status()}"
+        elif failing:
+            self._settling = True
+            reason = f"{self._throttled} rate limited" if self._throttled else f"{error_rate:.0%} server errors"
+            self.concurrency = max(1, int(concurrency * DECREASE_FACTOR))
+            self.batch_size = max(self.min_batch_size, int(batch_size * DECREASE_FACTOR))
+            message = f"Rate control ({reason}): concurrency {concurrency}->{self.concurrency}, batch {batch_size}->{self.batch_size}"
+        elif self._baseline is not None and average > self._baseline * LATENCY_TOLERANCE:
+            self._holding = True
+            message = f"Rate control holding (latency {average:.2f}s over baseline {self._baseline:.2f}s): {self.status()}"
+        else:
+            self._settling = False
+            self.concurrency = min(self.max_concurrency, concurrency + 1)
+            self.batch_size = min(self.max_batch_size, batch_size + self.batch_step)
+
+        if not self._throttled and not self._errors:
+            self._baseline = average if self._baseline is None else min(average, self._baseline * BASELINE_DRIFT)
+        self._reset_window()
+
+        if not message or (self._holding and was_holding):
+            return ""
+        self.last_decision = message
+        return self.last_decision
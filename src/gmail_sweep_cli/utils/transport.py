@@ -0,0 +1,112 @@
+"""Pooled keep-alive HTTP transport with shared, thread-safe credentials."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+import google.auth.credentials
+import google_auth_httplib2
+import httplib2
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT = 60
+# A token rejected with 401 right after a refresh is not refreshed again
+MIN_REFRESH_INTERVAL = 30
+
+
+class SharedCredentials(google.auth.credentials.Credentials):
+    """Credentials wrapper whose refresh is serialized across threads.
+
+    All pooled connections share one instance, so an expired token is
+    refreshed exactly once no matter how many requests are in flight.
+    """
+
+    def __init__(self, credentials, on_refresh: Optional[Callable] = None):
+        super().__init__()
+        self._credentials = credentials
+        self._on_refresh = on_refresh
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._sync()
+
+    def _sync(self) -> None:
+        """Copy token state from the wrapped credentials."""
+        self.token = self._credentials.token
+        self.expiry = self._credentials.expiry
+
+    def refresh(self, request) -> None:
+        """Refresh the token unless another thread just did."""
+        with self._lock:
+            if self.valid and time.monotonic() - self._last_refresh < MIN_REFRESH_INTERVAL:
+                return
+            self._credentials.refresh(request)
+            self._last_refresh = time.monotonic()
+            self._sync()
+            if self._on_refresh:
+                self._on_refresh(self._credentials)
+
+    def before_request(self, request, method, url, headers) -> None:
+        """Refresh if expired, then apply the token to the request headers."""
+        if not self.valid:
+            self.refresh(request)
+        self.apply(headers)
+
+    def apply(self, headers, token=None) -> None:
+        """Apply the bearer token to the request headers."""
+        headers["authorization"] = f"Bearer {token or self.token}"
+
+
+class PooledHttp:
+    """Thread-safe pool of keep-alive authorized HTTP connections.
+
+    httplib2.Http objects are not thread-safe, but each one keeps its
+    connections alive between requests. The pool hands out one Http per
+    request and returns it afterwards, so concurrent callers never share a
+    connection and sequential callers reuse a warm one.
+    """
+
+    def __init__(self, credentials: SharedCredentials, size: int = DEFAULT_POOL_SIZE, timeout: int = DEFAULT_TIMEOUT):
+        self.credentials = credentials
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> google_auth_httplib2.AuthorizedHttp:
+        """Take an idle connection, creating one if the pool is not full."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+        return self._idle.get()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        """Perform a request on a pooled connection."""
+        http = self._acquire()
+        try:
+            return http.request(uri, method, body=body, headers=headers, **kwargs)
+        finally:
+            self._idle.put(http)
+
+    def close(self) -> None:
+        """Close the sockets of all idle connections.
+
+        The Http objects stay in the pool and reconnect if used again.
+        """
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for http in idle:
+            http.close()
+            self._idle.put(http)